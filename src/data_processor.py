@@ -2,7 +2,7 @@ import pandas as pd
 import numpy as np
 import re
 from datetime import datetime, timedelta
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz
 from dateutil.parser import parse
 import logging
 from item_mapping import ItemMapping
@@ -288,7 +288,7 @@ class DataProcessor:
         Returns:
             float: Значение сходства от 0 до 100
         """
-        from fuzzywuzzy import fuzz
+        from rapidfuzz import fuzz
         
         try:
             # Проверяем, что элементы не None и не NaN
@@ -8,6 +8,7 @@ import os
 import logging
 import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Импортируем наши модули
 from data_processor import DataProcessor
@@ -19,6 +20,133 @@ from mapping_editor import MappingEditorDialog, ProgressDialog
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Число строк рекомендаций, начиная с которого таблица заполняется виртуально
+VIRTUAL_ROWS_THRESHOLD = 500
+
+# Число строк, начиная с которого вещественные столбцы форматируются целиком
+FLOAT_COLUMN_THRESHOLD = 5000
+
+# Форматы значений в таблицах: метод format создается один раз, а не разбирается при каждом вызове
+_FLOAT2 = "{:.2f}".format
+_DATE_DMY = '%d.%m.%Y'
+
+def _format_value(value):
+    """Форматирование значения ячейки таблицы со столбцом произвольного типа
+    
+    Args:
+        value: Значение ячейки
+        
+    Returns:
+        str: Строковое представление значения
+    """
+    # Проверка на пропуск без pd.isna: NaN - единственное значение, не равное самому себе
+    if value is None or value is pd.NaT or value is pd.NA or (isinstance(value, float) and value != value):
+        return ''
+    return _format_present_value(value)
+
+def _format_present_value(value):
+    """Форматирование заведомо не пустого значения ячейки со столбцом произвольного типа"""
+    if isinstance(value, (datetime, pd.Timestamp)):
+        # Форматируем дату без времени
+        return value.strftime(_DATE_DMY)
+    elif isinstance(value, (float, np.float64)):
+        return _FLOAT2(value)
+    else:
+        return str(value)
+
+def _format_float(value):
+    """Форматирование значения ячейки со столбцом вещественного типа"""
+    if value != value:
+        return ''
+    return _FLOAT2(value)
+
+def _format_float_column(column, fmt):
+    """Форматирование вещественного столбца целиком
+    
+    Значения извлекаются списком чисел Python: их форматирование заметно быстрее,
+    чем скаляров np.float64 из массива записей.
+    
+    Args:
+        column (pd.Series): Вещественный столбец
+        fmt (callable): Функция форматирования значения
+        
+    Returns:
+        list: Строковые значения столбца
+    """
+    return [fmt(value) for value in column.tolist()]
+
+def _format_date(value):
+    """Форматирование значения ячейки со столбцом типа даты"""
+    if value is pd.NaT or value is None:
+        return ''
+    return value.strftime(_DATE_DMY)
+
+def _column_formatters(data, columns):
+    """Выбор функций форматирования по типам столбцов
+    
+    Args:
+        data (pd.DataFrame): Данные для отображения
+        columns (list): Столбцы данных
+        
+    Returns:
+        list: Функции форматирования значений для каждого столбца
+    """
+    fmts = []
+    for col in columns:
+        dtype = data[col].dtype
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            fmts.append(_format_date)
+        elif isinstance(dtype, np.dtype) and dtype.kind in 'iub':
+            # Целые и логические столбцы NumPy не содержат пропусков
+            fmts.append(str)
+        else:
+            # Для столбцов без пропусков проверка на пропуск в каждой ячейке не нужна
+            has_missing = data[col].isna().any()
+            if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+                fmts.append(_format_float if has_missing else _FLOAT2)
+            else:
+                # Объектные столбцы и расширенные типы pandas (строки, nullable-числа)
+                fmts.append(_format_value if has_missing else _format_present_value)
+    return fmts
+
+def _format_first_item(items):
+    """Форматирование элементов группы: отображается первый элемент списка"""
+    if isinstance(items, list) and len(items) > 0:
+        return str(items[0])
+    return str(items)
+
+def _format_next_forecast(forecast):
+    """Форматирование следующей потребности: дата первого прогноза из списка"""
+    if isinstance(forecast, list) and len(forecast) > 0:
+        forecast_date = forecast[0].get('forecast_date')
+        if isinstance(forecast_date, (datetime, pd.Timestamp)):
+            return forecast_date.strftime(_DATE_DMY)
+        return str(forecast_date)
+    return ''
+
+class TreeSpec:
+    """Описание таблицы результатов: столбцы, заголовки и форматирование значений"""
+    
+    def __init__(self, tree, columns, headings, source_columns=None, formatters=None, insert_method=None):
+        """Инициализация описания таблицы
+        
+        Args:
+            tree (ttk.Treeview): Таблица
+            columns (list): Идентификаторы столбцов таблицы
+            headings (dict): Заголовки столбцов
+            source_columns (list, optional): Столбцы данных в порядке столбцов таблицы.
+                По умолчанию совпадают с columns.
+            formatters (list, optional): Функции форматирования значений для каждого столбца.
+                По умолчанию выбираются по типам столбцов данных.
+            insert_method (callable, optional): Метод вставки готовых строк
+        """
+        self.tree = tree
+        self.columns = columns
+        self.headings = headings
+        self.source_columns = source_columns or columns
+        self.formatters = formatters
+        self.insert_method = insert_method
+
 class MainApplication(tk.Tk):
     """Главное окно приложения"""
     
@@ -42,9 +170,17 @@ class MainApplication(tk.Tk):
         # Текущий загруженный файл
         self.current_file = None
         
+        # Результаты, ожидающие отображения до перехода на свою вкладку: {вкладка: (метод, данные)}
+        self._pending_display = {}
+        
+        # Фоновый поток для форматирования строк таблиц и ожидаемые результаты: {таблица: future}
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._display_futures = {}
+        
         # Создание интерфейса
         self._create_menu()
         self._create_main_frame()
+        self._create_table_specs()
         
         # Статус
         self.status_var = tk.StringVar()
@@ -121,6 +257,86 @@ class MainApplication(tk.Tk):
         self.notebook.add(self.recommendations_frame, text="Рекомендации")
         
         self.notebook.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+        
+        # Таблицы результатов заполняются только при переходе на их вкладку
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+    
+    def _schedule_display(self, frame, display_method, data):
+        """Отложенное отображение результатов на вкладке
+        
+        Если вкладка сейчас открыта, данные отображаются сразу, иначе - при первом
+        переходе на нее. Повторный вызов до перехода заменяет ожидающие данные.
+        
+        Args:
+            frame: Фрейм вкладки с таблицей
+            display_method (callable): Метод отображения данных в таблице
+            data (pd.DataFrame): Данные для отображения
+        """
+        self._pending_display[str(frame)] = (display_method, data)
+        if self.notebook.select() == str(frame):
+            self._flush_pending_display()
+    
+    def _on_tab_changed(self, event):
+        """Обработчик смены вкладки"""
+        self._flush_pending_display()
+    
+    def _flush_pending_display(self):
+        """Отображение ожидающих результатов для текущей вкладки"""
+        pending = self._pending_display.pop(self.notebook.select(), None)
+        if pending:
+            display_method, data = pending
+            display_method(data)
+    
+    def _create_table_specs(self):
+        """Создание описаний таблиц результатов и однократная настройка их столбцов"""
+        self._analysis_spec = TreeSpec(
+            self.analysis_table,
+            columns=['group_id', 'avg_interval_days', 'median_interval_days', 'min_interval_days',
+                     'max_interval_days', 'total_ordered', 'daily_consumption'],
+            headings={
+                'group_id': 'ID группы',
+                'avg_interval_days': 'Средний интервал (дни)',
+                'median_interval_days': 'Медианный интервал (дни)',
+                'min_interval_days': 'Мин. интервал (дни)',
+                'max_interval_days': 'Макс. интервал (дни)',
+                'total_ordered': 'Всего заказано',
+                'daily_consumption': 'Дневное потребление'
+            }
+        )
+        
+        # Элементы и следующая потребность берутся из первых элементов списков
+        self._forecast_spec = TreeSpec(
+            self.forecast_table,
+            columns=['group_id', 'items', 'lead_time_days', 'next_forecast'],
+            headings={
+                'group_id': 'ID группы',
+                'items': 'Элементы',
+                'lead_time_days': 'Срок поставки (дни)',
+                'next_forecast': 'Следующая потребность'
+            },
+            source_columns=['group_id', 'items', 'lead_time_days', 'forecast'],
+            formatters=[str, _format_first_item, str, _format_next_forecast]
+        )
+        
+        self._recommendations_spec = TreeSpec(
+            self.recommendations_table,
+            columns=['group_id', 'item', 'order_date', 'forecast_date', 'quantity'],
+            headings={
+                'group_id': 'ID группы',
+                'item': 'Наименование',
+                'order_date': 'Дата заказа',
+                'forecast_date': 'Дата потребности',
+                'quantity': 'Количество'
+            },
+            insert_method=self._fill_recommendations_table
+        )
+        
+        for spec in (self._analysis_spec, self._forecast_spec, self._recommendations_spec):
+            spec.tree['columns'] = spec.columns
+            spec.tree['show'] = 'headings'
+            for col in spec.columns:
+                spec.tree.heading(col, text=spec.headings.get(col, col))
+                spec.tree.column(col, width=100)
     
     def _create_data_tab(self, parent):
         """Создание вкладки 'Данные'"""
@@ -308,18 +524,32 @@ class MainApplication(tk.Tk):
         y_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL)
         
         # Таблица (Treeview)
+        # Вертикальная прокрутка идет через прокси: для больших наборов строк
+        # положение полосы прокрутки вычисляется по окну виртуальной таблицы
         self.recommendations_table = ttk.Treeview(table_frame, 
                                                  xscrollcommand=x_scrollbar.set,
-                                                 yscrollcommand=y_scrollbar.set)
+                                                 yscrollcommand=self._on_recommendations_tree_scroll)
+        self.recommendations_y_scrollbar = y_scrollbar
         
         # Настройка полос прокрутки
         x_scrollbar.config(command=self.recommendations_table.xview)
-        y_scrollbar.config(command=self.recommendations_table.yview)
+        y_scrollbar.config(command=self._recommendations_yview)
         
         # Размещение элементов
         x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.recommendations_table.pack(expand=True, fill=tk.BOTH)
+        
+        # Состояние виртуальной таблицы: все строки, первая видимая строка и набор строк Treeview
+        self._rec_rows = []
+        self._rec_start = 0
+        self._rec_pool = []
+        self._rec_virtual = False
+        
+        self.recommendations_table.bind('<MouseWheel>', self._on_recommendations_mousewheel)
+        self.recommendations_table.bind('<Button-4>', self._on_recommendations_mousewheel)
+        self.recommendations_table.bind('<Button-5>', self._on_recommendations_mousewheel)
+        self.recommendations_table.bind('<Configure>', self._on_recommendations_configure)
     
     def _open_file(self):
         """Открытие файла данных"""
@@ -424,7 +654,7 @@ class MainApplication(tk.Tk):
                 
                 if frequency_data is not None and not frequency_data.empty:
                     # Отображение результатов анализа
-                    self._display_analysis_results(frequency_data)
+                    self._schedule_display(self.analysis_frame, self._display_analysis_results, frequency_data)
                     
                     # Обновление списка групп
                     self._update_group_lists(frequency_data)
@@ -497,7 +727,7 @@ class MainApplication(tk.Tk):
         
         if predictions is not None and not predictions.empty:
             # Отображение результатов прогноза
-            self._display_forecast_results(predictions)
+            self._schedule_display(self.forecast_frame, self._display_forecast_results, predictions)
             
             self.status_var.set("Прогноз потребностей успешно создан")
             messagebox.showinfo("Информация", "Прогноз потребностей успешно создан")
@@ -519,8 +749,11 @@ class MainApplication(tk.Tk):
         recommendations = self.analyzer.generate_order_recommendations(days_ahead)
         
         if recommendations is not None and not recommendations.empty:
+            # Сохраняем рекомендации для возможного экспорта
+            self.analyzer.recommendations = recommendations
+            
             # Отображение рекомендаций
-            self._display_recommendations(recommendations)
+            self._schedule_display(self.recommendations_frame, self._display_recommendations, recommendations)
             
             self.status_var.set("Рекомендации успешно сформированы")
             messagebox.showinfo("Информация", f"Сформировано {len(recommendations)} рекомендаций по заказам")
@@ -649,7 +882,7 @@ class MainApplication(tk.Tk):
                         values.append('')
                     elif isinstance(value, (datetime, pd.Timestamp)):
                         # Форматируем дату без времени
-                        values.append(value.strftime('%d.%m.%Y'))
+                        values.append(value.strftime(_DATE_DMY))
                     elif isinstance(value, (list, tuple)):
                         values.append(str(value))
                     else:
@@ -668,51 +901,7 @@ class MainApplication(tk.Tk):
         Args:
             data (pd.DataFrame): Результаты анализа
         """
-        if data is None or data.empty:
-            return
-        
-        # Очищаем таблицу
-        for item in self.analysis_table.get_children():
-            self.analysis_table.delete(item)
-        
-        # Настраиваем столбцы
-        columns = ['group_id', 'avg_interval_days', 'median_interval_days', 'min_interval_days', 
-                  'max_interval_days', 'total_ordered', 'daily_consumption']
-        
-        self.analysis_table['columns'] = columns
-        self.analysis_table['show'] = 'headings'
-        
-        column_names = {
-            'group_id': 'ID группы',
-            'avg_interval_days': 'Средний интервал (дни)',
-            'median_interval_days': 'Медианный интервал (дни)',
-            'min_interval_days': 'Мин. интервал (дни)',
-            'max_interval_days': 'Макс. интервал (дни)',
-            'total_ordered': 'Всего заказано',
-            'daily_consumption': 'Дневное потребление'
-        }
-        
-        for col in columns:
-            self.analysis_table.heading(col, text=column_names.get(col, col))
-            self.analysis_table.column(col, width=100)
-        
-        # Добавляем данные
-        for _, row in data.iterrows():
-            values = []
-            for col in columns:
-                value = row[col]
-                if pd.isna(value):
-                    values.append('')
-                elif isinstance(value, (datetime, pd.Timestamp)):
-                    # Форматируем дату без времени
-                    values.append(value.strftime('%d.%m.%Y'))
-                elif isinstance(value, (float, np.float64)):
-                    values.append(f"{value:.2f}")
-                elif isinstance(value, (list, tuple)):
-                    values.append(str(value))
-                else:
-                    values.append(str(value))
-            self.analysis_table.insert('', 'end', values=values)
+        self._populate_tree(self._analysis_spec, data)
     
     def _display_forecast_results(self, data):
         """Отображение результатов прогноза в таблице
@@ -720,112 +909,211 @@ class MainApplication(tk.Tk):
         Args:
             data (pd.DataFrame): Результаты прогноза
         """
+        self._populate_tree(self._forecast_spec, data)
+    
+    def _display_recommendations(self, data):
+        """Отображение рекомендаций в таблице
+        
+        Args:
+            data (pd.DataFrame): Рекомендации
+        """
+        self._populate_tree(self._recommendations_spec, data)
+    
+    def _populate_tree(self, spec, data):
+        """Заполнение таблицы результатов по ее описанию
+        
+        Args:
+            spec (TreeSpec): Описание таблицы
+            data (pd.DataFrame): Данные для отображения
+        """
         if data is None or data.empty:
             return
         
-        # Очищаем таблицу
-        for item in self.forecast_table.get_children():
-            self.forecast_table.delete(item)
+        fmts = spec.formatters or _column_formatters(data, spec.source_columns)
+        self._display_async(spec.tree, data, spec.source_columns, fmts, spec.insert_method)
+    
+    def _display_async(self, table, data, columns, fmts, insert_method=None):
+        """Форматирование строк в фоновом потоке и их вставка в таблицу в основном потоке
         
-        # Настраиваем столбцы
-        columns = ['group_id', 'items', 'lead_time_days', 'next_forecast']
+        Args:
+            table (ttk.Treeview): Таблица для отображения
+            data (pd.DataFrame): Данные для отображения
+            columns (list): Столбцы данных в порядке столбцов таблицы
+            fmts (list): Функции форматирования значений для каждого столбца
+            insert_method (callable, optional): Метод вставки готовых строк.
+                По умолчанию строки вставляются в таблицу целиком.
+        """
+        if insert_method is None:
+            insert_method = lambda rows: self._insert_rows(table, rows)
+        
+        future = self._executor.submit(self._format_rows, data, columns, fmts)
+        self._display_futures[str(table)] = future
+        
+        # Вставка в таблицу возможна только из основного потока
+        future.add_done_callback(
+            lambda fut: self.after(0, lambda: self._on_rows_formatted(table, fut, insert_method)))
+    
+    def _on_rows_formatted(self, table, future, insert_method):
+        """Вставка отформатированных строк в таблицу
         
-        self.forecast_table['columns'] = columns
-        self.forecast_table['show'] = 'headings'
+        Args:
+            table (ttk.Treeview): Таблица для отображения
+            future (Future): Результат форматирования строк
+            insert_method (callable): Метод вставки готовых строк
+        """
+        # Пропускаем результат, если для таблицы уже запущено более новое форматирование
+        if self._display_futures.get(str(table)) is not future:
+            return
+        del self._display_futures[str(table)]
         
-        column_names = {
-            'group_id': 'ID группы',
-            'items': 'Элементы',
-            'lead_time_days': 'Срок поставки (дни)',
-            'next_forecast': 'Следующая потребность'
-        }
+        try:
+            rows = future.result()
+        except Exception as e:
+            logger.error(f"Ошибка при форматировании данных для таблицы: {e}")
+            return
         
-        for col in columns:
-            self.forecast_table.heading(col, text=column_names.get(col, col))
-            self.forecast_table.column(col, width=100)
+        insert_method(rows)
+    
+    @staticmethod
+    def _format_rows(data, columns, fmts):
+        """Форматирование строк таблицы
         
-        # Добавляем данные
-        for _, row in data.iterrows():
-            values = []
-            
-            # ID группы
-            values.append(str(row['group_id']))
-            
-            # Элементы (берем первый элемент из списка для отображения)
-            items = row['items']
-            if isinstance(items, list) and len(items) > 0:
-                values.append(str(items[0]))
-            else:
-                values.append(str(items))
-            
-            # Срок поставки
-            values.append(str(row['lead_time_days']))
-            
-            # Следующая потребность (берем первый прогноз из списка)
-            forecast = row['forecast']
-            if isinstance(forecast, list) and len(forecast) > 0:
-                next_forecast = forecast[0]
-                forecast_date = next_forecast.get('forecast_date')
-                if isinstance(forecast_date, (datetime, pd.Timestamp)):
-                    values.append(forecast_date.strftime('%d.%m.%Y'))
-                else:
-                    values.append(str(forecast_date))
-            else:
-                values.append('')
+        Не обращается к Tk, поэтому может выполняться в фоновом потоке.
+        
+        Args:
+            data (pd.DataFrame): Данные для отображения
+            columns (list): Столбцы данных в порядке столбцов таблицы
+            fmts (list): Функции форматирования значений для каждого столбца
             
-            self.forecast_table.insert('', 'end', values=values)
+        Returns:
+            list: Кортежи значений строк таблицы
+        """
+        frame = data[columns]
+        fmts = list(fmts)
+        
+        # Даты и вещественные столбцы больших таблиц форматируем целиком до преобразования в массив записей
+        preformatted = {}
+        for i, fmt in enumerate(fmts):
+            if fmt is _format_date:
+                preformatted[i] = frame[columns[i]].dt.strftime(_DATE_DMY).fillna('')
+            elif (fmt is _format_float or fmt is _FLOAT2) and len(frame) > FLOAT_COLUMN_THRESHOLD:
+                preformatted[i] = _format_float_column(frame[columns[i]], fmt)
+        
+        if preformatted:
+            frame = frame.copy()
+            for i, values in preformatted.items():
+                frame[columns[i]] = values
+                fmts[i] = str
+        
+        # Массив записей NumPy обходится без создания Series для каждой строки
+        records = frame.to_records(index=False)
+        
+        positions = range(len(fmts))
+        return [tuple(fmts[i](record[i]) for i in positions) for record in records]
     
-    def _display_recommendations(self, data):
-        """Отображение рекомендаций в таблице
+    def _insert_rows(self, table, rows):
+        """Замена содержимого таблицы отформатированными строками
         
         Args:
-            data (pd.DataFrame): Рекомендации
+            table (ttk.Treeview): Таблица для отображения
+            rows (list): Значения строк таблицы
         """
-        if data is None or data.empty:
-            return
+        children = table.get_children()
+        if children:
+            table.delete(*children)
         
-        # Сохраняем рекомендации для возможного экспорта
-        self.analyzer.recommendations = data
+        for values in rows:
+            table.insert('', 'end', values=values)
+    
+    def _fill_recommendations_table(self, rows):
+        """Заполнение таблицы рекомендаций отформатированными строками
         
-        # Очищаем таблицу
-        for item in self.recommendations_table.get_children():
-            self.recommendations_table.delete(item)
+        Небольшие наборы вставляются целиком. Для больших в таблице создается
+        постоянный набор строк по высоте видимой области, содержимое которых
+        подменяется при прокрутке.
         
-        # Настраиваем столбцы
-        columns = ['group_id', 'item', 'order_date', 'forecast_date', 'quantity']
-        
-        self.recommendations_table['columns'] = columns
-        self.recommendations_table['show'] = 'headings'
-        
-        column_names = {
-            'group_id': 'ID группы',
-            'item': 'Наименование',
-            'order_date': 'Дата заказа',
-            'forecast_date': 'Дата потребности',
-            'quantity': 'Количество'
-        }
-        
-        for col in columns:
-            self.recommendations_table.heading(col, text=column_names.get(col, col))
-            self.recommendations_table.column(col, width=100)
-        
-        # Добавляем данные
-        for _, row in data.iterrows():
-            values = []
-            for col in columns:
-                value = row[col]
-                if pd.isna(value):
-                    values.append('')
-                elif isinstance(value, (datetime, pd.Timestamp)):
-                    # Форматируем дату без времени
-                    values.append(value.strftime('%d.%m.%Y'))
-                elif isinstance(value, (float, np.float64)):
-                    values.append(f"{value:.2f}")
-                elif isinstance(value, (list, tuple)):
-                    values.append(str(value))
-                else:
-                    values.append(str(value))
-            self.recommendations_table.insert('', 'end', values=values)
+        Args:
+            rows (list): Значения строк таблицы
+        """
+        children = self.recommendations_table.get_children()
+        if children:
+            self.recommendations_table.delete(*children)
+        
+        self._rec_rows = rows
+        self._rec_start = 0
+        self._rec_pool = []
+        self._rec_virtual = len(rows) > VIRTUAL_ROWS_THRESHOLD
+        
+        if self._rec_virtual:
+            self._resize_recommendations_pool()
+        else:
+            for values in rows:
+                self.recommendations_table.insert('', 'end', values=values)
+    
+    def _resize_recommendations_pool(self):
+        """Подгонка числа строк виртуальной таблицы под высоту видимой области"""
+        rowheight = ttk.Style().lookup('Treeview', 'rowheight')
+        rowheight = int(rowheight) if rowheight else 20
+        # Одна строка по высоте занята заголовками столбцов
+        visible = max(1, self.recommendations_table.winfo_height() // rowheight - 1)
+        size = min(len(self._rec_rows), visible)
+        
+        while len(self._rec_pool) < size:
+            self._rec_pool.append(self.recommendations_table.insert('', 'end'))
+        if len(self._rec_pool) > size:
+            self.recommendations_table.delete(*self._rec_pool[size:])
+            del self._rec_pool[size:]
+        
+        self._refresh_recommendations_window()
+    
+    def _refresh_recommendations_window(self):
+        """Вывод в виртуальную таблицу строк, начиная с текущей позиции прокрутки"""
+        total = len(self._rec_rows)
+        size = len(self._rec_pool)
+        self._rec_start = max(0, min(self._rec_start, total - size))
+        
+        for offset, iid in enumerate(self._rec_pool):
+            self.recommendations_table.item(iid, values=self._rec_rows[self._rec_start + offset])
+        
+        self.recommendations_y_scrollbar.set(self._rec_start / total, (self._rec_start + size) / total)
+    
+    def _recommendations_yview(self, *args):
+        """Команда вертикальной полосы прокрутки таблицы рекомендаций"""
+        if not self._rec_virtual:
+            return self.recommendations_table.yview(*args)
+        
+        if args[0] == 'moveto':
+            self._rec_start = int(float(args[1]) * len(self._rec_rows))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= len(self._rec_pool)
+            self._rec_start += step
+        
+        self._refresh_recommendations_window()
+    
+    def _on_recommendations_tree_scroll(self, first, last):
+        """Прокси yscrollcommand таблицы рекомендаций
+        
+        В виртуальном режиме положение полосы прокрутки задается
+        _refresh_recommendations_window, а собственные значения таблицы игнорируются.
+        """
+        if not self._rec_virtual:
+            self.recommendations_y_scrollbar.set(first, last)
+    
+    def _on_recommendations_mousewheel(self, event):
+        """Прокрутка колесом мыши в виртуальной таблице рекомендаций"""
+        if not self._rec_virtual:
+            return None
+        
+        step = -3 if event.num == 4 or event.delta > 0 else 3
+        self._recommendations_yview('scroll', step, 'units')
+        return 'break'
+    
+    def _on_recommendations_configure(self, event):
+        """Обработчик изменения размера таблицы рекомендаций"""
+        if self._rec_virtual:
+            self._resize_recommendations_pool()
     
     def _update_group_lists(self, data):
         """Обновление списков групп в комбобоксах
@@ -836,8 +1124,8 @@ class MainApplication(tk.Tk):
         if data is None or data.empty:
             return
         
-        # Получаем список групп
-        groups = data['group_id'].tolist()
+        # Получаем список уникальных групп в порядке первого появления
+        groups = pd.unique(data['group_id']).tolist()
         
         # Обновляем комбобоксы
         self.group_combo['values'] = groups
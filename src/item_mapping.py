@@ -7,17 +7,220 @@
 
 import os
 import json
+import mmap
+import shutil
+import tempfile
 import pandas as pd
 import numpy as np
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, process
 import logging
 import re
 import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# orjson ускоряет чтение и запись базы соответствий; без него используется стандартный json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pyarrow позволяет хранить базу соответствий в формате Parquet
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Шаблоны нормализации текста компилируются один раз
+_RE_PUNCT = re.compile(r'[^\w\s]')
+_RE_WS = re.compile(r'\s+')
+
+# Ключ метаданных Parquet-файла с названиями групп
+PARQUET_GROUPS_KEY = b'groups'
+
+# Число новых элементов, сравниваемых с базой соответствий за один пакет
+MATCH_BLOCK_SIZE = 256
+
+# Доля общего прогресса поиска похожих элементов, приходящаяся на сравнение с базой, %
+MATCH_PROGRESS_SHARE = 90
+
+# Число пакетов, обрабатываемых одновременно: память растет с каждым пакетом в работе
+MATCH_WORKERS = min(4, os.cpu_count() or 1)
+
+def _score_cutoffs(similarity_threshold):
+    """Отсечки сходства наименований и артикулов для заданного порога
+    
+    Взвешенное сходство 0.4 * наименование + 0.6 * артикул не достигнет порога, если
+    одна из составляющих ниже своей отсечки, даже при полном совпадении другой.
+    Запас 0.5 учитывает округление оценок до целых.
+    
+    Args:
+        similarity_threshold (int): Порог сходства (0-100)
+        
+    Returns:
+        tuple: Отсечки сходства наименований и артикулов
+    """
+    name_cutoff = max(0, (similarity_threshold - 60) / 0.4 - 0.5)
+    code_cutoff = max(0, (similarity_threshold - 40) / 0.6 - 0.5)
+    return name_cutoff, code_cutoff
+
+def _length_window(lengths, name_cutoff):
+    """Диапазон длин наименований, с которыми сходство может достичь отсечки
+    
+    fuzz.ratio не превышает 200 * min(l1, l2) / (l1 + l2), поэтому строки, длины которых
+    различаются сильнее, заведомо не похожи и могут не сравниваться.
+    
+    Args:
+        lengths (np.ndarray): Длины наименований
+        name_cutoff (float): Отсечка сходства наименований
+        
+    Returns:
+        tuple: Минимальные и максимальные допустимые длины
+    """
+    if name_cutoff <= 0:
+        return np.zeros_like(lengths), np.full_like(lengths, np.iinfo(lengths.dtype).max)
+    
+    ratio = name_cutoff / (200 - name_cutoff)
+    return np.ceil(lengths * ratio).astype(lengths.dtype), np.floor(lengths / ratio).astype(lengths.dtype)
+
+def _load_json_mmap(file_path):
+    """Чтение JSON через orjson из отображенного в память файла
+    
+    Файл не копируется в промежуточный буфер bytes, orjson разбирает страницы напрямую.
+    
+    Args:
+        file_path (str): Путь к файлу
+        
+    Returns:
+        object: Разобранные данные
+    """
+    with open(file_path, 'rb') as f:
+        # Пустой файл нельзя отобразить в память
+        if os.fstat(f.fileno()).st_size == 0:
+            return orjson.loads(b'')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+def _write_file_atomic(file_path, write):
+    """Запись файла через временный файл в той же директории
+    
+    Файл заменяется только после полной записи, поэтому прерванное сохранение
+    не оставляет на диске обрезанную базу.
+    
+    Args:
+        file_path (str): Путь к файлу
+        write (callable): Функция, записывающая данные в переданный двоичный файл
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(file_path) + '.', suffix='.tmp')
+    try:
+        # fsync выполняется по дескриптору, открытому на запись: в Windows для
+        # дескриптора только для чтения он завершается ошибкой
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp создает файл с правами 0600; сохраняем права прежнего файла
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class _KnownItemsIndex:
+    """Индекс известных элементов базы соответствий для пакетного поиска похожих
+    
+    Строки приводятся к нижнему регистру и упорядочиваются по длине наименования один раз
+    при построении индекса, а не при каждом поиске.
+    """
+    
+    def __init__(self, items):
+        """Построение индекса
+        
+        Args:
+            items (list): Известные элементы (наименование, артикул) в порядке индекса базы
+        """
+        self.items = items
+        names = np.array([str(name).lower() for name, _ in items], dtype=object)
+        codes = np.array([str(code).lower() for _, code in items], dtype=object)
+        lengths = np.fromiter(map(len, names), dtype=np.int64, count=len(names))
+        
+        # Позиции в порядке длины наименований; items[order[k]] - k-й элемент по длине
+        self.order = np.argsort(lengths, kind='stable').astype(np.int32)
+        self.lengths = lengths[self.order]
+        self.names = names[self.order]
+        self.codes = codes[self.order]
+        self.has_code = self.codes != ''
+    
+    def __len__(self):
+        return len(self.items)
+
+class _DisjointSet:
+    """Система непересекающихся множеств для объединения элементов в группы"""
+    
+    def __init__(self, size):
+        """Инициализация: каждый элемент в своем множестве
+        
+        Args:
+            size (int): Количество элементов
+        """
+        self.parent = list(range(size))
+    
+    def find(self, i):
+        """Поиск представителя множества со сжатием пути
+        
+        Args:
+            i (int): Индекс элемента
+            
+        Returns:
+            int: Индекс представителя множества
+        """
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    def union(self, i, j):
+        """Объединение множеств двух элементов
+        
+        Представителем становится меньший индекс, то есть элемент, встреченный раньше.
+        
+        Args:
+            i (int): Индекс первого элемента
+            j (int): Индекс второго элемента
+        """
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+def _is_parquet_file(file_path):
+    """Проверка, что файл базы соответствий хранится в формате Parquet
+    
+    Args:
+        file_path (str): Путь к файлу
+        
+    Returns:
+        bool: True для файлов с расширением .parquet
+    """
+    return file_path.lower().endswith('.parquet')
+
 class ItemMapping:
     """Класс для работы с базой соответствий артикулов и наименований и поиска похожих элементов"""
     
@@ -30,14 +233,28 @@ class ItemMapping:
         self.mapping_file = mapping_file or os.path.join('data', 'item_mapping.json')
         self.mappings = {}  # Словарь соответствий: {id_группы: {name: str, items: list}}
         self.similar_items_map = {}  # Словарь для хранения соответствия элементов и групп
+        self._item_index = {}  # Индекс элементов: {(наименование, артикул): id_последней_группы}
+        self._first_groups = {}  # Первая группа для элементов, входящих в несколько групп
+        self._known_index = None  # Индекс для поиска похожих, строится по требованию
+        self._dirty = False  # Есть несохраненные изменения
+        self._deferred = False  # Сохранение отложено до выхода из bulk_update
+        self._group_counter = 0  # Последний номер группы вида group_N
         self.load_mappings()
     
     def load_mappings(self):
-        """Загрузка базы соответствий из файла"""
+        """Загрузка базы соответствий из файла
+        
+        Файл с расширением .parquet читается через pyarrow, остальные - как JSON.
+        """
         try:
             if os.path.exists(self.mapping_file):
-                with open(self.mapping_file, 'r', encoding='utf-8') as f:
-                    self.mappings = json.load(f)
+                if _is_parquet_file(self.mapping_file):
+                    self.mappings = self._read_parquet(self.mapping_file)
+                elif orjson is not None:
+                    self.mappings = _load_json_mmap(self.mapping_file)
+                else:
+                    with open(self.mapping_file, 'r', encoding='utf-8') as f:
+                        self.mappings = json.load(f)
                 logger.info(f"База соответствий загружена из {self.mapping_file}")
             else:
                 logger.info("Файл базы соответствий не найден, создана новая база")
@@ -46,21 +263,220 @@ class ItemMapping:
         except Exception as e:
             logger.error(f"Ошибка при загрузке базы соответствий: {e}")
             self.mappings = {}
+        
+        self._rebuild_index()
+        self._reset_group_counter()
     
-    def save_mappings(self):
-        """Сохранение базы соответствий в файл"""
-        try:
-            # Создаем директорию, если она не существует
-            os.makedirs(os.path.dirname(self.mapping_file), exist_ok=True)
+    def _rebuild_index(self):
+        """Перестроение индекса элементов по базе соответствий
+        
+        Если элемент входит в несколько групп, индекс указывает на последнюю из них
+        (ее использует поиск похожих элементов), а первая запоминается отдельно
+        для get_group_for_item.
+        """
+        self._item_index = {}
+        self._first_groups = {}
+        self._known_index = None
+        for group_id, group in self.mappings.items():
+            for item in group['items']:
+                item_key = (item['name'], item['code'])
+                if item_key in self._item_index and item_key not in self._first_groups:
+                    self._first_groups[item_key] = self._item_index[item_key]
+                self._item_index[item_key] = group_id
+    
+    def save_mappings(self, mappings=None):
+        """Сохранение базы соответствий в файл
+        
+        Файл с расширением .parquet записывается через pyarrow, остальные - как JSON.
+        Данные пишутся во временный файл, который затем заменяет прежний.
+        
+        Args:
+            mappings (dict, optional): Снимок базы (см. snapshot) для записи из другого
+                потока; по умолчанию записывается текущая база
             
-            with open(self.mapping_file, 'w', encoding='utf-8') as f:
-                json.dump(self.mappings, f, ensure_ascii=False, indent=2)
+        Returns:
+            bool: Успешность операции
+        """
+        data = self.mappings if mappings is None else mappings
+        try:
+            if _is_parquet_file(self.mapping_file):
+                _write_file_atomic(self.mapping_file, lambda f: self._write_parquet(f, data))
+            else:
+                _write_file_atomic(self.mapping_file, lambda f: self._write_json(f, data))
             logger.info(f"База соответствий сохранена в {self.mapping_file}")
+            if mappings is None:
+                self._dirty = False
             return True
         except Exception as e:
             logger.error(f"Ошибка при сохранении базы соответствий: {e}")
             return False
     
+    def save_mappings_parquet(self, file_path):
+        """Сохранение базы соответствий в файл Parquet
+        
+        Args:
+            file_path (str): Путь к файлу
+            
+        Returns:
+            bool: Успешность операции
+        """
+        try:
+            _write_file_atomic(file_path, lambda f: self._write_parquet(f, self.mappings))
+            logger.info(f"База соответствий сохранена в {file_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении базы соответствий в Parquet: {e}")
+            return False
+    
+    def load_mappings_parquet(self, file_path):
+        """Загрузка базы соответствий из файла Parquet
+        
+        Args:
+            file_path (str): Путь к файлу
+            
+        Returns:
+            bool: Успешность операции
+        """
+        try:
+            self.mappings = self._read_parquet(file_path)
+            self._rebuild_index()
+            self._reset_group_counter()
+            logger.info(f"База соответствий загружена из {file_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке базы соответствий из Parquet: {e}")
+            return False
+    
+    def _write_json(self, f, mappings):
+        """Запись базы соответствий в JSON
+        
+        Args:
+            f: Двоичный файл, открытый на запись
+            mappings (dict): Записываемая база соответствий
+        """
+        if orjson is not None:
+            f.write(orjson.dumps(mappings, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            f.write(json.dumps(mappings, ensure_ascii=False, indent=2).encode('utf-8'))
+    
+    def _write_parquet(self, f, mappings):
+        """Запись базы соответствий в Parquet
+        
+        Элементы хранятся плоской таблицей (group_id, name, code), а названия групп
+        в порядке базы - в метаданных схемы, чтобы сохранить и пустые группы.
+        
+        Args:
+            f: Двоичный файл, открытый на запись
+            mappings (dict): Записываемая база соответствий
+        """
+        if pq is None:
+            raise ImportError("Для работы с Parquet требуется пакет pyarrow")
+        
+        group_ids, names, codes = [], [], []
+        for group_id, group in mappings.items():
+            for item in group['items']:
+                group_ids.append(str(group_id))
+                names.append(item['name'])
+                codes.append(item['code'])
+        
+        group_names = {str(group_id): group['name'] for group_id, group in mappings.items()}
+        if orjson is not None:
+            groups_metadata = orjson.dumps(group_names)
+        else:
+            groups_metadata = json.dumps(group_names, ensure_ascii=False).encode('utf-8')
+        
+        table = pa.table(
+            {'group_id': pa.array(group_ids, pa.string()),
+             'name': pa.array(names, pa.string()),
+             'code': pa.array(codes, pa.string())},
+            metadata={PARQUET_GROUPS_KEY: groups_metadata}
+        )
+        pq.write_table(table, f)
+    
+    def _read_parquet(self, file_path):
+        """Чтение базы соответствий из Parquet
+        
+        Args:
+            file_path (str): Путь к файлу
+            
+        Returns:
+            dict: Словарь соответствий
+        """
+        if pq is None:
+            raise ImportError("Для работы с Parquet требуется пакет pyarrow")
+        
+        table = pq.read_table(file_path)
+        groups_metadata = (table.schema.metadata or {}).get(PARQUET_GROUPS_KEY, b'{}')
+        group_names = orjson.loads(groups_metadata) if orjson is not None else json.loads(groups_metadata)
+        
+        mappings = {group_id: {'name': name, 'items': []} for group_id, name in group_names.items()}
+        columns = table.to_pydict()
+        for group_id, name, code in zip(columns['group_id'], columns['name'], columns['code']):
+            group = mappings.get(group_id)
+            if group is None:
+                group = mappings[group_id] = {'name': f"Группа {len(mappings) + 1}", 'items': []}
+            group['items'].append({'name': name, 'code': code})
+        
+        return mappings
+    
+    def _commit_changes(self):
+        """Сохранение изменений базы соответствий, если запись не отложена"""
+        self._dirty = True
+        if not self._deferred:
+            self.save_mappings()
+    
+    @contextmanager
+    def bulk_update(self, save=True):
+        """Пакетное изменение базы соответствий
+        
+        Изменения внутри блока with записываются в файл один раз при выходе из него.
+        Вложенные блоки сохраняют базу только при выходе из внешнего.
+        
+        Args:
+            save (bool): Сохранить базу при выходе из блока; False - запись выполняет
+                вызывающий код (например, отложенно через snapshot)
+        """
+        outer_deferred = self._deferred
+        self._deferred = True
+        try:
+            yield self
+        finally:
+            self._deferred = outer_deferred
+            if save and not outer_deferred and self._dirty:
+                self.save_mappings()
+    
+    def snapshot(self):
+        """Копия базы соответствий для записи в другом потоке
+        
+        Копируются словари групп и списки элементов; сами элементы при изменениях
+        базы не изменяются, а заменяются, поэтому их можно разделять.
+        
+        Returns:
+            dict: Снимок базы соответствий
+        """
+        return {group_id: {**group, 'items': list(group['items'])} for group_id, group in self.mappings.items()}
+    
+    def create_group(self, name):
+        """Создание пустой группы соответствий
+        
+        Args:
+            name (str): Название группы
+            
+        Returns:
+            str: Идентификатор новой группы или None при ошибке
+        """
+        try:
+            group_id = self.next_group_id()
+            self.mappings[group_id] = {
+                'name': name,
+                'items': []
+            }
+            self._commit_changes()
+            return group_id
+        except Exception as e:
+            logger.error(f"Ошибка при создании группы: {e}")
+            return None
+    
     def add_item_to_group(self, group_id, item_name, item_code):
         """Добавление элемента в группу соответствий
         
@@ -107,7 +523,14 @@ class ItemMapping:
                 # Добавляем элемент в существующую группу
                 self.mappings[group_id]['items'].append(item)
             
-            self.save_mappings()
+            if (item_name, item_code) not in self._item_index:
+                self._item_index[(item_name, item_code)] = group_id
+                self._known_index = None
+            else:
+                # Элемент уже входит в другую группу: первая и последняя группы
+                # определяются порядком групп в базе
+                self._rebuild_index()
+            self._commit_changes()
             return True
         except Exception as e:
             logger.error(f"Ошибка при добавлении элемента в группу: {e}")
@@ -138,7 +561,9 @@ class ItemMapping:
                     if not items:
                         del self.mappings[group_id]
                     
-                    self.save_mappings()
+                    # Элемент мог входить и в другие группы, поэтому индекс перестраивается
+                    self._rebuild_index()
+                    self._commit_changes()
                     return True
             
             logger.warning(f"Элемент {item_name} ({item_code}) не найден в группе {group_id}")
@@ -163,12 +588,57 @@ class ItemMapping:
                 return False
             
             self.mappings[group_id]['name'] = new_name
-            self.save_mappings()
+            self._commit_changes()
             return True
         except Exception as e:
             logger.error(f"Ошибка при переименовании группы: {e}")
             return False
     
+    def _reset_group_counter(self):
+        """Установка счетчика групп по максимальному номеру group_N в базе"""
+        self._group_counter = 0
+        for group_id in self.mappings:
+            prefix, _, number = group_id.partition('_')
+            if prefix == 'group' and number.isdigit():
+                self._group_counter = max(self._group_counter, int(number))
+    
+    def next_group_id(self):
+        """Идентификатор для новой группы, созданной вручную
+        
+        Returns:
+            str: Свободный идентификатор вида group_N
+        """
+        self._group_counter += 1
+        group_id = f"group_{self._group_counter}"
+        # Идентификатор мог быть занят, если база изменялась в обход счетчика
+        while group_id in self.mappings:
+            self._group_counter += 1
+            group_id = f"group_{self._group_counter}"
+        return group_id
+    
+    def delete_group(self, group_id):
+        """Удаление группы соответствий
+        
+        Args:
+            group_id (str): Идентификатор группы
+            
+        Returns:
+            bool: Успешность операции
+        """
+        try:
+            if group_id not in self.mappings:
+                logger.warning(f"Группа {group_id} не найдена")
+                return False
+            
+            del self.mappings[group_id]
+            
+            self._rebuild_index()
+            self._commit_changes()
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при удалении группы: {e}")
+            return False
+    
     def merge_groups(self, source_group_id, target_group_id):
         """Объединение двух групп соответствий
         
@@ -177,16 +647,17 @@ class ItemMapping:
             target_group_id (str): Идентификатор целевой группы
             
         Returns:
-            bool: Успешность операции
+            dict: Изменения базы {'added': [...], 'removed': [...], 'modified': [...]}
+                со списками идентификаторов групп; пустой словарь при ошибке
         """
         try:
             if source_group_id not in self.mappings:
                 logger.warning(f"Исходная группа {source_group_id} не найдена")
-                return False
+                return {}
             
             if target_group_id not in self.mappings:
                 logger.warning(f"Целевая группа {target_group_id} не найдена")
-                return False
+                return {}
             
             # Объединяем элементы групп
             source_items = self.mappings[source_group_id]['items']
@@ -200,11 +671,12 @@ class ItemMapping:
             # Удаляем исходную группу
             del self.mappings[source_group_id]
             
-            self.save_mappings()
-            return True
+            self._rebuild_index()
+            self._commit_changes()
+            return {'added': [], 'removed': [source_group_id], 'modified': [target_group_id]}
         except Exception as e:
             logger.error(f"Ошибка при объединении групп: {e}")
-            return False
+            return {}
     
     def get_group_for_item(self, item_name, item_code):
         """Поиск группы для элемента
@@ -217,12 +689,8 @@ class ItemMapping:
             str: Идентификатор группы или None, если группа не найдена
         """
         try:
-            for group_id, group in self.mappings.items():
-                for item in group['items']:
-                    if item['name'] == item_name and item['code'] == item_code:
-                        return group_id
-            
-            return None
+            item_key = (item_name, item_code)
+            return self._first_groups.get(item_key) or self._item_index.get(item_key)
         except Exception as e:
             logger.error(f"Ошибка при поиске группы для элемента: {e}")
             return None
@@ -230,6 +698,10 @@ class ItemMapping:
     def find_similar_items(self, data, name_col, code_col, similarity_threshold=85, progress_callback=None):
         """Поиск похожих наименований и артикулов
         
+        Данные могут быть как исходной таблицей, так и заранее подготовленными уникальными
+        парами: из них используются только столбцы name_col и code_col, а повторяющиеся
+        строки отбрасываются.
+        
         Args:
             data (pd.DataFrame): Данные для анализа
             name_col (str): Имя столбца с наименованиями
@@ -237,6 +709,7 @@ class ItemMapping:
             similarity_threshold (int): Порог сходства (0-100)
             progress_callback (callable, optional): Функция обратного вызова для отображения прогресса.
                 Принимает два аргумента: текущий прогресс (0-100) и сообщение о статусе.
+                Сравнение с базой занимает первые MATCH_PROGRESS_SHARE процентов, группировка - остальные.
             
         Returns:
             dict: Словарь групп похожих элементов
@@ -266,92 +739,85 @@ class ItemMapping:
             if not self.mappings:
                 logger.info("База соответствий пуста. Будет выполнен поиск 100% совпадений наименований и/или артикулов.")
             
-            # Создаем карту соответствий для быстрого поиска
-            logger.info("Создание карты соответствий")
-            item_to_group = {}
-            for group_id, group in self.mappings.items():
-                for item in group['items']:
-                    item_key = (item['name'], item['code'])
-                    item_to_group[item_key] = group_id
-            
-            # Получаем уникальные пары (наименование, артикул) из данных
-            unique_items = set()
-            for _, row in data.iterrows():
-                name = row[name_col]
-                code = row[code_col]
-                
-                # Проверяем на NaN и преобразуем в строки
-                if pd.isna(name):
-                    name = ""
-                else:
-                    name = str(name)
-                    
-                if pd.isna(code):
-                    code = ""
-                else:
-                    code = str(code)
-                    
-                unique_items.add((name, code))
+            # Карта соответствий для быстрого поиска поддерживается при изменениях базы;
+            # элемент из нескольких групп относится к последней из них
+            item_to_group = self._item_index
+            
+            # Получаем уникальные пары (наименование, артикул) из данных: дубликаты
+            # отбрасываются до приведения к строкам, чтобы преобразовывать только
+            # уникальные строки. Разные исходные значения могут дать одинаковые строки,
+            # поэтому пары еще раз дедуплицируются с сохранением порядка. Наименование и
+            # артикул могут храниться в одном столбце, поэтому значения берутся по позиции
+            pairs = data[[name_col, code_col]].drop_duplicates().astype(object)
+            # Пропуски заменяются после приведения к object: fillna("") недопустим
+            # для столбцов с типами Int64, boolean, Float64
+            pairs = pairs.where(pairs.notna(), "").astype(str)
+            unique_items = list(dict.fromkeys(zip(pairs.iloc[:, 0].tolist(), pairs.iloc[:, 1].tolist())))
             
             logger.info(f"Обработка {len(unique_items)} уникальных пар")
             
-            # Обрабатываем каждую уникальную пару
+            # Сходство элементов, которых нет в базе, со всеми известными элементами
+            # вычисляется пакетно: индекс первого известного элемента не ниже порога.
+            # Строки приводятся к нижнему регистру один раз и передаются параллельными
+            # массивами, а orig_items связывает их индексы с исходными парами
+            known_index = self._get_known_index()
+            known_items = known_index.items
+            known_matches = {}
+            match_share = 0  # Доля прогресса, занятая сравнением с базой
+            if self.mappings and known_items:
+                match_share = MATCH_PROGRESS_SHARE
+                match_progress = None
+                if progress_callback:
+                    def match_progress(progress, status_text):
+                        progress_callback(progress * match_share // 100, status_text)
+                orig_items = [item for item in unique_items if item not in item_to_group]
+                matches = self._match_known_items(
+                    np.array([name.lower() for name, _ in orig_items], dtype=object),
+                    np.array([code.lower() for _, code in orig_items], dtype=object),
+                    known_index,
+                    similarity_threshold,
+                    match_progress
+                )
+                known_matches = {item: index for item, index in zip(orig_items, matches) if index >= 0}
+            
+            # При непустой базе элемент относится к группе найденного в базе или первого
+            # похожего известного элемента, остальные получают новые группы. При пустой базе
+            # элементы объединяются в компоненты связности по 100% совпадениям наименований
+            # или артикулов, поэтому группы не зависят от порядка обхода
             total_items = len(unique_items)
+            components = None
+            if not self.mappings:
+                components = _DisjointSet(total_items)
+                first_by_name = {}
+                first_by_code = {}
+                for i, (name, code) in enumerate(unique_items):
+                    if name:
+                        components.union(first_by_name.setdefault(name, i), i)
+                    if code:
+                        components.union(first_by_code.setdefault(code, i), i)
+            
+            # Новый идентификатор группы создается по первому непустому элементу компоненты
+            new_groups = {}
             for i, item in enumerate(unique_items):
                 # Обновляем прогресс
                 if progress_callback and i % 10 == 0:
-                    progress = int(i / total_items * 100)
+                    progress = match_share + int(i / total_items * (100 - match_share))
                     progress_callback(progress, f"Обработано {i} из {total_items} элементов")
                 
                 try:
-                    name, code = item
-                    
-                    # Проверяем, есть ли элемент в базе соответствий
                     if item in item_to_group:
-                        # Элемент уже есть в базе, используем существующую группу
                         group_id = item_to_group[item]
-                        self.similar_items_map[item] = group_id
+                    elif item in known_matches:
+                        group_id = item_to_group[known_items[known_matches[item]]]
                     else:
-                        # Ищем похожие элементы среди уже известных групп
-                        found_match = False
-                        
-                        # Если база соответствий не пуста, используем обычный поиск похожих элементов
-                        if self.mappings:
-                            for known_item, known_group_id in item_to_group.items():
-                                similarity = self._calculate_similarity(item, known_item)
-                                
-                                if similarity >= similarity_threshold:
-                                    # Нашли похожий элемент, добавляем в его группу
-                                    self.similar_items_map[item] = known_group_id
-                                    found_match = True
-                                    break
-                        # Если база пуста, ищем только среди уже обработанных элементов
-                        else:
-                            # Ищем 100% совпадения среди уже обработанных элементов
-                            for processed_item, processed_group_id in self.similar_items_map.items():
-                                name, code = item
-                                proc_name, proc_code = processed_item
-                                
-                                # Проверяем на 100% совпадение наименования или артикула
-                                if (name and name == proc_name) or (code and code == proc_code):
-                                    self.similar_items_map[item] = processed_group_id
-                                    found_match = True
-                                    break
-                        
-                        if not found_match:
-                            # Не нашли похожих элементов, создаем новую группу
-                            # Но только если элемент не пустой
-                            if name.strip() or code.strip():
-                                # Используем артикул в качестве идентификатора группы
-                                if code.strip():
-                                    # Если есть артикул, используем его
-                                    new_group_id = f"art_{code.strip()}"
-                                else:
-                                    # Если артикула нет, используем часть наименования
-                                    # Убираем пробелы и спецсимволы
-                                    clean_name = ''.join(c for c in name if c.isalnum())
-                                    new_group_id = f"name_{clean_name[:10]}"
-                                self.similar_items_map[item] = new_group_id
+                        key = components.find(i) if components is not None else i
+                        group_id = new_groups.get(key)
+                        if group_id is None:
+                            group_id = self._new_group_id(item)
+                            if group_id is None:
+                                continue
+                            new_groups[key] = group_id
+                    self.similar_items_map[item] = group_id
                 except Exception as e:
                     logger.error(f"Ошибка при обработке элемента {item}: {e}")
                     continue
@@ -364,13 +830,12 @@ class ItemMapping:
             logger.info(f"Найдено {len(unique_groups)} групп похожих элементов")
             
             # Формируем результат
+            grouped_items = defaultdict(list)
             for item_key, group_id in self.similar_items_map.items():
-                if group_id not in similar_groups:
-                    similar_groups[group_id] = []
-                similar_groups[group_id].append(item_key)
+                grouped_items[group_id].append(item_key)
             
             # Удаляем группы, содержащие только один элемент, так как они не имеют смысла для сопоставления
-            similar_groups = {group_id: items for group_id, items in similar_groups.items() if len(items) > 1}
+            similar_groups = {group_id: items for group_id, items in grouped_items.items() if len(items) > 1}
             logger.info(f"После фильтрации групп с одним элементом осталось {len(similar_groups)} групп")
             
             return similar_groups
@@ -379,6 +844,127 @@ class ItemMapping:
             logger.error(f"Детали ошибки: {traceback.format_exc()}")
             return {}
     
+    def _get_known_index(self):
+        """Индекс известных элементов для поиска похожих
+        
+        Индекс строится при первом поиске после загрузки или изменения базы.
+        
+        Returns:
+            _KnownItemsIndex: Индекс известных элементов
+        """
+        if self._known_index is None:
+            self._known_index = _KnownItemsIndex(list(self._item_index.keys()))
+        return self._known_index
+    
+    def _new_group_id(self, item):
+        """Идентификатор новой группы для элемента
+        
+        Args:
+            item (tuple): Элемент (наименование, артикул)
+            
+        Returns:
+            str: Идентификатор группы или None для пустого элемента
+        """
+        name, code = item
+        
+        # Не создаем группу для пустого элемента
+        if not (name.strip() or code.strip()):
+            return None
+        
+        # Используем артикул в качестве идентификатора группы
+        if code.strip():
+            return f"art_{code.strip()}"
+        
+        # Если артикула нет, используем часть наименования без пробелов и спецсимволов
+        clean_name = ''.join(c for c in name if c.isalnum())
+        return f"name_{clean_name[:10]}"
+    
+    def _match_known_items(self, names, codes, known_index, similarity_threshold, progress_callback=None):
+        """Пакетный поиск похожих известных элементов
+        
+        Сходство элементов - fuzz.ratio наименований, а при непустых артикулах у обоих
+        элементов - среднее с весом 0.4 для наименования и 0.6 для артикула. Элементы сравниваются
+        в порядке длины наименований пакетами по MATCH_BLOCK_SIZE в пуле потоков, и каждый
+        пакет сравнивается только с известными элементами допустимой длины (см. _length_window).
+        
+        Args:
+            names (np.ndarray): Наименования новых элементов в нижнем регистре
+            codes (np.ndarray): Артикулы новых элементов в нижнем регистре
+            known_index (_KnownItemsIndex): Индекс известных элементов
+            similarity_threshold (int): Порог сходства (0-100)
+            progress_callback (callable, optional): Функция обратного вызова для отображения прогресса
+            
+        Returns:
+            np.ndarray: Позиция в known_index.items первого известного элемента со сходством
+                не ниже порога для каждого нового элемента или -1, если такого нет
+        """
+        total_items = len(names)
+        matches = np.full(total_items, -1, dtype=np.int64)
+        if not total_items or not len(known_index):
+            return matches
+        
+        # Оценки ниже отсечек не влияют на результат, и RapidFuzz их не досчитывает
+        name_cutoff, code_cutoff = _score_cutoffs(similarity_threshold)
+        
+        # Новые элементы, как и известные в индексе, упорядочиваются по длине наименования,
+        # чтобы пакет сравнивался с непрерывным диапазоном известных элементов
+        lengths = np.fromiter(map(len, names), dtype=np.int64, count=total_items)
+        item_order = np.argsort(lengths, kind='stable')
+        known_order = known_index.order
+        known_lengths = known_index.lengths
+        known_names = known_index.names
+        known_codes = known_index.codes
+        known_has_code = known_index.has_code
+        
+        min_lengths, max_lengths = _length_window(lengths[item_order], name_cutoff)
+        
+        def match_block(start):
+            """Поиск совпадений для пакета новых элементов, начиная с позиции start"""
+            stop = min(start + MATCH_BLOCK_SIZE, total_items)
+            block = item_order[start:stop]
+            
+            # Длины в пакете возрастают, поэтому окно задается первым и последним элементом
+            lo = np.searchsorted(known_lengths, min_lengths[start], side='left')
+            hi = np.searchsorted(known_lengths, max_lengths[stop - 1], side='right')
+            if lo >= hi:
+                return stop
+            
+            name_scores = process.cdist(names[block], known_names[lo:hi], scorer=fuzz.ratio,
+                                        score_cutoff=name_cutoff, dtype=np.int16, workers=1)
+            code_scores = process.cdist(codes[block], known_codes[lo:hi], scorer=fuzz.ratio,
+                                        score_cutoff=code_cutoff, dtype=np.int16, workers=1)
+            
+            # Сходство считается в целых числах, умноженным на 5, на месте матрицы артикулов:
+            # 2 * наименование + 3 * артикул, если артикулы есть у обоих элементов,
+            # иначе 5 * наименование. Отдельные матрицы маски и взвешенных оценок не создаются
+            scores = code_scores
+            scores -= name_scores
+            scores *= 3
+            scores *= (codes[block] != '')[:, None]
+            scores *= known_has_code[None, lo:hi]
+            name_scores *= 5
+            scores += name_scores
+            del name_scores
+            found = scores >= 5 * similarity_threshold
+            del scores, code_scores
+            
+            # Среди подходящих выбирается первый известный элемент в исходном порядке;
+            # минимум ищется построчно, чтобы не создавать вторую матрицу размера пакета
+            window_order = known_order[lo:hi]
+            for row in np.flatnonzero(found.any(axis=1)):
+                matches[block[row]] = window_order[found[row]].min()
+            return stop
+        
+        # Пакеты обрабатываются параллельно: RapidFuzz и NumPy освобождают GIL, а каждый
+        # пакет записывает результаты только в свои позиции массива matches
+        with ThreadPoolExecutor(max_workers=MATCH_WORKERS) as executor:
+            for stop in executor.map(match_block, range(0, total_items, MATCH_BLOCK_SIZE)):
+                if progress_callback:
+                    progress_callback(int(stop / total_items * 100),
+                                      f"Сравнено {stop} из {total_items} новых элементов с базой")
+        
+        return matches
+    
     def _normalize_text(self, text):
         """Нормализация текста для сравнения
         
@@ -395,74 +981,13 @@ class ItemMapping:
         text = str(text).lower()
         
         # Удаляем все символы, кроме букв, цифр и пробелов
-        text = re.sub(r'[^\w\s]', '', text)
+        text = _RE_PUNCT.sub('', text)
         
         # Удаляем лишние пробелы
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _RE_WS.sub(' ', text).strip()
         
         return text
     
-    def _calculate_similarity(self, item1, item2):
-        """Вычисляет сходство между двумя элементами
-        
-        Args:
-            item1: Первый элемент (наименование, артикул)
-            item2: Второй элемент (наименование, артикул)
-            
-        Returns:
-            float: Значение сходства от 0 до 100
-        """
-        try:
-            # Проверяем, что элементы не None и не NaN
-            if item1 is None or item2 is None or pd.isna(item1) or pd.isna(item2):
-                return 0
-            
-            # Если элементы представлены как кортежи (наименование, артикул)
-            if isinstance(item1, tuple) and isinstance(item2, tuple):
-                name1, code1 = item1
-                name2, code2 = item2
-                
-                # Проверяем на NaN и преобразуем в строки
-                if pd.isna(name1):
-                    name1 = ""
-                else:
-                    name1 = str(name1).lower()
-                    
-                if pd.isna(name2):
-                    name2 = ""
-                else:
-                    name2 = str(name2).lower()
-                    
-                if pd.isna(code1):
-                    code1 = ""
-                else:
-                    code1 = str(code1).lower()
-                    
-                if pd.isna(code2):
-                    code2 = ""
-                else:
-                    code2 = str(code2).lower()
-                
-                # Вычисляем сходство наименований
-                name_similarity = fuzz.ratio(name1, name2)
-                
-                # Если артикулы не пустые, учитываем их в общем сходстве
-                if code1 and code2:
-                    code_similarity = fuzz.ratio(code1, code2)
-                    # Среднее значение с большим весом для артикула
-                    return (name_similarity * 0.4 + code_similarity * 0.6)
-                else:
-                    # Если артикулы отсутствуют, используем только сходство наименований
-                    return name_similarity
-            else:
-                # Если элементы представлены как строки или другие типы
-                item1_str = "" if pd.isna(item1) else str(item1).lower()
-                item2_str = "" if pd.isna(item2) else str(item2).lower()
-                return fuzz.ratio(item1_str, item2_str)
-        except Exception as e:
-            logger.error(f"Ошибка при вычислении сходства: {e}")
-            return 0  # В случае ошибки возвращаем 0
-    
     def update_from_similar_items(self, similar_items):
         """Обновление базы соответствий из найденных похожих элементов
         
@@ -470,10 +995,21 @@ class ItemMapping:
             similar_items (dict): Словарь групп похожих элементов
             
         Returns:
-            int: Количество добавленных групп
+            dict: Изменения базы {'added': [...], 'removed': [...], 'modified': [...]}
+                со списками идентификаторов групп: новые группы и замененные группы
+                с теми же идентификаторами; пустой словарь, если база не изменилась
         """
         try:
-            added_groups = 0
+            added_ids = []
+            modified_ids = []
+            
+            # Инвертированный индекс: элемент -> группы базы, в которые он входит.
+            # Похожими (_compare_groups) могут быть только группы с общими элементами,
+            # поэтому новая группа сравнивается лишь с ними, а не со всей базой
+            groups_by_item = defaultdict(set)
+            for existing_id, existing_group in self.mappings.items():
+                for item in existing_group['items']:
+                    groups_by_item[(item['name'], item['code'])].add(existing_id)
             
             for group_id, items_list in similar_items.items():
                 # Пропускаем группы с одним элементом, так как они не имеют смысла для сопоставления
@@ -506,26 +1042,36 @@ class ItemMapping:
                 }
                 
                 # Проверяем, есть ли уже такая группа в базе
-                exists = False
-                for existing_id, existing_group in self.mappings.items():
-                    if self._compare_groups(group_items, existing_group['items']):
-                        exists = True
-                        break
+                candidates = set()
+                for item in group_items:
+                    candidates.update(groups_by_item.get((item['name'], item['code']), ()))
+                exists = any(self._compare_groups(group_items, self.mappings[existing_id]['items'])
+                             for existing_id in candidates)
                 
                 if not exists and len(group_items) > 1:
                     # Добавляем новую группу только если в ней более одного элемента
                     # Используем артикул в качестве идентификатора группы
+                    if group_id in self.mappings:
+                        for item in self.mappings[group_id]['items']:
+                            groups_by_item[(item['name'], item['code'])].discard(group_id)
+                        modified_ids.append(group_id)
+                    else:
+                        added_ids.append(group_id)
                     self.mappings[group_id] = group
-                    added_groups += 1
-            
-            if added_groups > 0:
-                self.save_mappings()
+                    for item in group_items:
+                        groups_by_item[(item['name'], item['code'])].add(group_id)
             
+            added_groups = len(added_ids) + len(modified_ids)
             logger.info(f"Добавлено {added_groups} новых групп в базу соответствий")
-            return added_groups
+            if not added_groups:
+                return {}
+            
+            self._rebuild_index()
+            self._commit_changes()
+            return {'added': added_ids, 'removed': [], 'modified': modified_ids}
         except Exception as e:
             logger.error(f"Ошибка при обновлении базы соответствий: {e}")
-            return 0
+            return {}
     
     def _compare_groups(self, group1, group2):
         """Сравнение двух групп элементов
@@ -541,13 +1087,9 @@ class ItemMapping:
         if abs(len(group1) - len(group2)) > 2:
             return False
         
-        # Считаем количество совпадающих элементов
-        matches = 0
-        for item1 in group1:
-            for item2 in group2:
-                if item1['name'] == item2['name'] and item1['code'] == item2['code']:
-                    matches += 1
-                    break
+        # Считаем количество элементов первой группы, которые есть во второй
+        items2 = {(item['name'], item['code']) for item in group2}
+        matches = sum((item['name'], item['code']) in items2 for item in group1)
         
         # Если совпадает более половины элементов, считаем группы похожими
         return matches >= min(len(group1), len(group2)) / 2
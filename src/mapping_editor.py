@@ -9,13 +9,56 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import pandas as pd
 import logging
+import re
 import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from item_mapping import ItemMapping
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Минимальный интервал между перерисовками диалога прогресса, с (~30 раз в секунду)
+PROGRESS_UPDATE_INTERVAL = 0.033
+
+# Период опроса прогресса фонового поиска, мс
+PROGRESS_POLL_MS = 33
+
+# Задержка сохранения базы после последнего изменения в редакторе, мс
+SAVE_DELAY_MS = 500
+
+# Группы с большим числом элементов выводятся в виртуальную таблицу
+VIRTUAL_ROWS_THRESHOLD = 500
+
+# Ключевые слова в именах столбцов с наименованием и артикулом ('норм' - столбцы норм, пропускаются)
+_RE_ITEM_COLUMN = re.compile(r'наименование|артикул|норм', re.IGNORECASE)
+
+def _center_on_parent(window, parent):
+    """Размещение окна по центру родительского окна
+    
+    Вызывается через after_idle, чтобы не выполнять лишний синхронный пересчет
+    геометрии при создании окна. Задается только положение, размер окна
+    Tk определяет сам.
+    
+    Args:
+        window: Окно, которое нужно разместить
+        parent: Родительское окно
+    """
+    if not window.winfo_exists():
+        return
+    width = window.winfo_width()
+    if width <= 1:
+        width = window.winfo_reqwidth()
+    height = window.winfo_height()
+    if height <= 1:
+        height = window.winfo_reqheight()
+    x = parent.winfo_rootx() + (parent.winfo_width() - width) // 2
+    y = parent.winfo_rooty() + (parent.winfo_height() - height) // 2
+    window.geometry(f"+{x}+{y}")
+
+
 class MappingEditor(ttk.Frame):
     """Класс для редактирования базы соответствий артикулов и наименований"""
     
@@ -32,11 +75,43 @@ class MappingEditor(ttk.Frame):
         self.item_mapping = item_mapping
         self.data_processor = data_processor
         
-        # Текущая выбранная группа
+        # Текущая выбранная группа и ее данные из базы соответствий
         self.current_group_id = None
+        self._current_group = None
         
-        # Список для хранения идентификаторов групп
+        # Список для хранения идентификаторов групп (позиция в списке групп -> id группы),
+        # обратный индекс и подписи строк списка для обновления только измененных строк
         self.group_ids = []
+        self._group_id_to_index = {}
+        self._group_labels = {}
+        
+        # Найденные столбцы наименований и артикулов: (ссылка на данные, наименование, артикул)
+        self._columns_cache = None
+        
+        # Уникальные пары (наименование, артикул) для автопоиска: (ссылка на данные, столбцы, пары).
+        # Данные хранятся слабыми ссылками, чтобы кэши не удерживали прежний processed_data
+        # после загрузки новых данных; кэш сбрасывается, когда набор данных освобожден.
+        self._pairs_cache = None
+        
+        # База сохраняется через SAVE_DELAY_MS после последнего изменения: снимок базы
+        # записывается в фоновом потоке, и редактирование во время записи не блокируется.
+        # Записи выполняются по очереди одним потоком, который дожидаются при выходе
+        self._save_pending = False
+        self._save_after_id = None
+        self._save_future = None
+        self._save_executor = ThreadPoolExecutor(max_workers=1)
+        self.bind('<Destroy>', self._on_destroy)
+        
+        # Состояние виртуальной таблицы элементов: все строки группы, первая видимая строка
+        # и набор строк Treeview
+        self._group_rows = []
+        self._items_start = 0
+        self._items_pool = []
+        self._items_virtual = False
+        
+        # Идет перезагрузка списка групп; повторный вызов в это время откладывается до ее конца
+        self._loading = False
+        self._reload_requested = False
         
         # Создание интерфейса
         self._create_widgets()
@@ -50,7 +125,7 @@ class MappingEditor(ttk.Frame):
         button_frame = ttk.Frame(self)
         button_frame.pack(fill=tk.X, padx=5, pady=5)
         
-        ttk.Button(button_frame, text="Обновить", command=self._load_mappings).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Обновить", command=self._refresh_mappings).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Создать группу", command=self._create_group).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Переименовать группу", command=self._rename_group).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Объединить группы", command=self._merge_groups).pack(side=tk.LEFT, padx=5)
@@ -101,18 +176,21 @@ class MappingEditor(ttk.Frame):
         items_y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Таблица элементов
+        # Вертикальная прокрутка идет через прокси: для больших групп
+        # положение полосы прокрутки вычисляется по окну виртуальной таблицы
         self.items_table = ttk.Treeview(
             items_scroll_frame,
             columns=('name', 'code'),
             show='headings',
             xscrollcommand=items_x_scrollbar.set,
-            yscrollcommand=items_y_scrollbar.set
+            yscrollcommand=self._on_items_tree_scroll
         )
         self.items_table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.items_y_scrollbar = items_y_scrollbar
         
         # Настройка полос прокрутки
         items_x_scrollbar.config(command=self.items_table.xview)
-        items_y_scrollbar.config(command=self.items_table.yview)
+        items_y_scrollbar.config(command=self._items_yview)
         
         # Настройка столбцов таблицы
         self.items_table.heading('name', text='Наименование')
@@ -121,9 +199,16 @@ class MappingEditor(ttk.Frame):
         self.items_table.column('name', width=300)
         self.items_table.column('code', width=150)
         
-        # Привязываем контекстное меню к таблице элементов
+        # Контекстное меню таблицы элементов создается один раз
+        self._item_context_menu = tk.Menu(self, tearoff=0)
+        self._item_context_menu.add_command(label="Удалить", command=self._delete_selected_item)
         self.items_table.bind('<Button-3>', self._show_item_context_menu)
         
+        self.items_table.bind('<MouseWheel>', self._on_items_mousewheel)
+        self.items_table.bind('<Button-4>', self._on_items_mousewheel)
+        self.items_table.bind('<Button-5>', self._on_items_mousewheel)
+        self.items_table.bind('<Configure>', self._on_items_configure)
+        
         # Фрейм для добавления нового элемента
         add_item_frame = ttk.LabelFrame(items_frame, text="Добавить элемент")
         add_item_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -138,28 +223,145 @@ class MappingEditor(ttk.Frame):
         
         ttk.Button(add_item_frame, text="Добавить", command=self._add_item).grid(row=2, column=0, columnspan=2, padx=5, pady=5)
     
+    def _modify(self, action, *args):
+        """Изменение базы соответствий с отложенным сохранением
+        
+        Args:
+            action (callable): Изменяющий метод ItemMapping
+            *args: Аргументы метода
+            
+        Returns:
+            Результат метода
+        """
+        with self.item_mapping.bulk_update(save=False):
+            result = action(*args)
+        if result:
+            self._schedule_save()
+        return result
+    
+    def _schedule_save(self):
+        """Планирование сохранения базы; повторные вызовы откладывают его"""
+        self._save_pending = True
+        if self._save_after_id is not None:
+            self.after_cancel(self._save_after_id)
+        self._save_after_id = self.after(SAVE_DELAY_MS, self._flush_save)
+    
+    def _flush_save(self):
+        """Запуск отложенного сохранения базы в фоновом потоке"""
+        if self._save_after_id is not None:
+            self.after_cancel(self._save_after_id)
+            self._save_after_id = None
+        self._save_pending = False
+        
+        # Снимок берется в потоке интерфейса, запись идет вне его
+        snapshot = self.item_mapping.snapshot()
+        self._save_future = self._save_executor.submit(self.item_mapping.save_mappings, snapshot)
+    
+    def _flush_save_sync(self):
+        """Немедленное сохранение отложенных изменений с ожиданием фоновой записи"""
+        if self._save_pending:
+            self._flush_save()
+        
+        # Записи выполняются по очереди, поэтому достаточно дождаться последней
+        if self._save_future is not None:
+            self._save_future.result()
+            self._save_future = None
+    
+    def _on_destroy(self, event):
+        """Сохранение изменений при закрытии редактора"""
+        if event.widget is not self:
+            return
+        
+        self._flush_save_sync()
+        self._save_executor.shutdown()
+    
+    def _refresh_mappings(self):
+        """Повторное чтение базы соответствий из файла по кнопке «Обновить»
+        
+        Отложенные изменения предварительно записываются, чтобы не потерять их.
+        """
+        self._flush_save_sync()
+        self.item_mapping.load_mappings()
+        self._load_mappings()
+    
     def _load_mappings(self):
-        """Загрузка соответствий в интерфейс"""
-        # Очищаем список групп
-        self.groups_listbox.delete(0, tk.END)
+        """Загрузка соответствий в интерфейс
+        
+        Список групп не перестраивается целиком: удаляются строки удаленных групп,
+        обновляются подписи измененных и добавляются новые группы.
+        """
+        # Повторный вызов во время перезагрузки не очищает список второй раз,
+        # а выполняется один раз после ее завершения
+        if self._loading:
+            self._reload_requested = True
+            return
         
+        self._loading = True
+        try:
+            self._reload_requested = True
+            while self._reload_requested:
+                self._reload_requested = False
+                self._sync_group_list()
+        finally:
+            self._loading = False
+    
+    def _sync_group_list(self):
+        """Приведение списка групп в соответствие с базой"""
         # Загружаем группы
         mappings = self.item_mapping.get_all_mappings()
-        
-        # Создаем список для хранения идентификаторов групп
-        self.group_ids = []
-        
-        for group_id, group in mappings.items():
-            self.groups_listbox.insert(tk.END, f"{group['name']} ({len(group['items'])} элементов)")
-            # Сохраняем id группы в отдельном списке
-            self.group_ids.append(group_id)
+        labels = {group_id: self._group_label(group) for group_id, group in mappings.items()}
+        
+        # Удаляем строки групп, которых больше нет (с конца, чтобы не сдвигать индексы)
+        for index in range(len(self.group_ids) - 1, -1, -1):
+            if self.group_ids[index] not in labels:
+                self.groups_listbox.delete(index)
+                del self._group_labels[self.group_ids[index]]
+                del self.group_ids[index]
+        
+        # Оставшиеся группы должны идти в том же порядке, что и в базе, а новые - после них;
+        # иначе (например, после загрузки другой базы) список строится заново
+        new_ids = [group_id for group_id in labels if group_id not in self._group_labels]
+        if self.group_ids + new_ids != list(labels):
+            self.groups_listbox.delete(0, tk.END)
+            self.group_ids = []
+            self._group_labels = {}
+            new_ids = list(labels)
+        
+        # Обновляем подписи измененных групп
+        for index, group_id in enumerate(self.group_ids):
+            if self._group_labels[group_id] != labels[group_id]:
+                self.groups_listbox.delete(index)
+                self.groups_listbox.insert(index, labels[group_id])
+                self._group_labels[group_id] = labels[group_id]
+        
+        # Добавляем новые группы одним вызовом Listbox.insert
+        if new_ids:
+            self.groups_listbox.insert(tk.END, *[labels[group_id] for group_id in new_ids])
+            # Сохраняем id групп в отдельном списке
+            self.group_ids.extend(new_ids)
+            self._group_labels.update((group_id, labels[group_id]) for group_id in new_ids)
+        
+        self._group_id_to_index = {group_id: index for index, group_id in enumerate(self.group_ids)}
+        self.groups_listbox.selection_clear(0, tk.END)
         
         # Очищаем таблицу элементов
-        for item in self.items_table.get_children():
-            self.items_table.delete(item)
+        self._clear_items_table()
         
         # Сбрасываем текущую группу
         self.current_group_id = None
+        self._current_group = None
+    
+    @staticmethod
+    def _group_label(group):
+        """Подпись группы в списке групп
+        
+        Args:
+            group (dict): Группа соответствий
+            
+        Returns:
+            str: Название группы с числом элементов
+        """
+        return f"{group['name']} ({len(group['items'])} элементов)"
     
     def _on_group_selected(self, event):
         """Обработчик выбора группы в списке"""
@@ -172,6 +374,7 @@ class MappingEditor(ttk.Frame):
         if 0 <= index < len(self.group_ids):
             group_id = self.group_ids[index]
             self.current_group_id = group_id
+            self._current_group = self.item_mapping.get_group(group_id)
             
             # Загружаем элементы выбранной группы
             self._load_group_items(group_id)
@@ -183,17 +386,196 @@ class MappingEditor(ttk.Frame):
             group_id (str): Идентификатор группы
         """
         # Очищаем таблицу элементов
-        for item in self.items_table.get_children():
-            self.items_table.delete(item)
+        self._clear_items_table()
         
         # Получаем группу
         group = self.item_mapping.get_group(group_id)
         if not group:
             return
         
-        # Загружаем элементы группы
-        for item in group['items']:
-            self.items_table.insert('', tk.END, values=(item['name'], item['code']))
+        rows = [(item['name'], item['code']) for item in group['items']]
+        self._group_rows = rows
+        self._items_virtual = len(rows) > VIRTUAL_ROWS_THRESHOLD
+        
+        # Для большой группы в таблице создается постоянный набор строк по высоте
+        # видимой области, содержимое которых подменяется при прокрутке
+        if self._items_virtual:
+            self._resize_items_pool()
+            return
+        
+        # Загружаем элементы группы; на время вставки таблица снимается с экрана,
+        # чтобы Tk не пересчитывал размещение после каждой строки
+        insert = self.items_table.insert
+        self.items_table.pack_forget()
+        try:
+            for values in rows:
+                insert('', tk.END, values=values)
+        finally:
+            self.items_table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    
+    def _update_group_row(self, group_id):
+        """Обновление подписи одной группы в списке групп без перезагрузки списка
+        
+        Args:
+            group_id (str): Идентификатор группы
+        """
+        index = self._group_id_to_index.get(group_id)
+        group = self.item_mapping.get_group(group_id)
+        if index is None or group is None:
+            return
+        
+        label = self._group_label(group)
+        if label == self._group_labels.get(group_id):
+            return
+        
+        self.groups_listbox.delete(index)
+        self.groups_listbox.insert(index, label)
+        self._group_labels[group_id] = label
+        
+        # Строка заменена, поэтому выделение текущей группы восстанавливается
+        if group_id == self.current_group_id:
+            self.groups_listbox.selection_set(index)
+    
+    def _apply_diff(self, diff):
+        """Обновление списка групп по изменениям базы соответствий
+        
+        Args:
+            diff (dict): Изменения базы {'added': [...], 'removed': [...], 'modified': [...]}
+        """
+        removed = set(diff.get('removed', ()))
+        added = [group_id for group_id in diff.get('added', ()) if group_id not in self._group_id_to_index]
+        
+        # Удаляем строки удаленных групп (с конца, чтобы не сдвигать индексы)
+        for index in sorted((self._group_id_to_index[group_id] for group_id in removed
+                             if group_id in self._group_id_to_index), reverse=True):
+            self.groups_listbox.delete(index)
+            del self._group_labels[self.group_ids[index]]
+            del self.group_ids[index]
+        
+        # Новые группы добавляются в конец базы, поэтому и в конец списка
+        mappings = self.item_mapping.get_all_mappings()
+        if added:
+            labels = [self._group_label(mappings[group_id]) for group_id in added]
+            self.groups_listbox.insert(tk.END, *labels)
+            self.group_ids.extend(added)
+            self._group_labels.update(zip(added, labels))
+        
+        if removed or added:
+            self._group_id_to_index = {group_id: index for index, group_id in enumerate(self.group_ids)}
+        
+        for group_id in diff.get('modified', ()):
+            self._update_group_row(group_id)
+        
+        # Текущая группа удалена или изменена - обновляем таблицу элементов
+        if self.current_group_id in removed:
+            self.groups_listbox.selection_clear(0, tk.END)
+            self._clear_items_table()
+            self.current_group_id = None
+            self._current_group = None
+        elif self.current_group_id in diff.get('modified', ()):
+            self._current_group = self.item_mapping.get_group(self.current_group_id)
+            self._load_group_items(self.current_group_id)
+    
+    def _append_item_row(self, values):
+        """Добавление строки в конец таблицы элементов текущей группы
+        
+        Args:
+            values (tuple): Наименование и артикул элемента
+        """
+        self._group_rows.append(values)
+        if self._items_virtual:
+            self._refresh_items_window()
+        else:
+            self.items_table.insert('', tk.END, values=values)
+    
+    def _remove_item_row(self, iid):
+        """Удаление строки из таблицы элементов текущей группы
+        
+        Args:
+            iid (str): Идентификатор строки таблицы
+        """
+        if self._items_virtual:
+            del self._group_rows[self._items_start + self._items_pool.index(iid)]
+            self._resize_items_pool()
+        else:
+            del self._group_rows[self.items_table.index(iid)]
+            self.items_table.delete(iid)
+    
+    def _clear_items_table(self):
+        """Очистка таблицы элементов одним вызовом"""
+        children = self.items_table.get_children()
+        if children:
+            self.items_table.delete(*children)
+        
+        self._group_rows = []
+        self._items_start = 0
+        self._items_pool = []
+        self._items_virtual = False
+    
+    def _resize_items_pool(self):
+        """Подгонка числа строк виртуальной таблицы под высоту видимой области"""
+        rowheight = ttk.Style().lookup('Treeview', 'rowheight')
+        rowheight = int(rowheight) if rowheight else 20
+        # Одна строка по высоте занята заголовками столбцов
+        visible = max(1, self.items_table.winfo_height() // rowheight - 1)
+        size = min(len(self._group_rows), visible)
+        
+        while len(self._items_pool) < size:
+            self._items_pool.append(self.items_table.insert('', tk.END))
+        if len(self._items_pool) > size:
+            self.items_table.delete(*self._items_pool[size:])
+            del self._items_pool[size:]
+        
+        self._refresh_items_window()
+    
+    def _refresh_items_window(self):
+        """Вывод в виртуальную таблицу строк, начиная с текущей позиции прокрутки"""
+        total = len(self._group_rows)
+        size = len(self._items_pool)
+        self._items_start = max(0, min(self._items_start, total - size))
+        
+        for offset, iid in enumerate(self._items_pool):
+            self.items_table.item(iid, values=self._group_rows[self._items_start + offset])
+        
+        self.items_y_scrollbar.set(self._items_start / total, (self._items_start + size) / total)
+    
+    def _items_yview(self, *args):
+        """Команда вертикальной полосы прокрутки таблицы элементов"""
+        if not self._items_virtual:
+            return self.items_table.yview(*args)
+        
+        if args[0] == 'moveto':
+            self._items_start = int(float(args[1]) * len(self._group_rows))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= len(self._items_pool)
+            self._items_start += step
+        
+        self._refresh_items_window()
+    
+    def _on_items_tree_scroll(self, first, last):
+        """Прокси yscrollcommand таблицы элементов
+        
+        В виртуальном режиме положение полосы прокрутки задается
+        _refresh_items_window, а собственные значения таблицы игнорируются.
+        """
+        if not self._items_virtual:
+            self.items_y_scrollbar.set(first, last)
+    
+    def _on_items_mousewheel(self, event):
+        """Прокрутка колесом мыши в виртуальной таблице элементов"""
+        if not self._items_virtual:
+            return None
+        
+        step = -3 if event.num == 4 or event.delta > 0 else 3
+        self._items_yview('scroll', step, 'units')
+        return 'break'
+    
+    def _on_items_configure(self, event):
+        """Обработчик изменения размера таблицы элементов"""
+        if self._items_virtual:
+            self._resize_items_pool()
     
     def _create_group(self):
         """Создание новой группы соответствий"""
@@ -203,15 +585,9 @@ class MappingEditor(ttk.Frame):
             return
         
         # Создаем новую группу
-        group_id = f"group_{len(self.item_mapping.get_all_mappings()) + 1}"
-        self.item_mapping.mappings[group_id] = {
-            'name': name,
-            'items': []
-        }
-        self.item_mapping.save_mappings()
-        
-        # Обновляем список групп
-        self._load_mappings()
+        if self._modify(self.item_mapping.create_group, name):
+            # Обновляем список групп
+            self._load_mappings()
     
     def _rename_group(self):
         """Переименование выбранной группы"""
@@ -220,7 +596,7 @@ class MappingEditor(ttk.Frame):
             return
         
         # Получаем текущее название группы
-        group = self.item_mapping.get_group(self.current_group_id)
+        group = self._current_group
         if not group:
             return
         
@@ -234,9 +610,9 @@ class MappingEditor(ttk.Frame):
             return
         
         # Переименовываем группу
-        if self.item_mapping.rename_group(self.current_group_id, new_name):
-            # Обновляем список групп
-            self._load_mappings()
+        if self._modify(self.item_mapping.rename_group, self.current_group_id, new_name):
+            # Обновляем строку группы в списке
+            self._update_group_row(self.current_group_id)
     
     def _merge_groups(self):
         """Объединение двух групп соответствий"""
@@ -262,25 +638,24 @@ class MappingEditor(ttk.Frame):
         
         ttk.Label(dialog, text="Выберите целевую группу:").pack(padx=10, pady=10)
         
-        target_listbox = tk.Listbox(dialog)
-        target_listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        for group_id, name in target_groups:
-            target_listbox.insert(tk.END, name)
-            target_listbox.itemconfig(tk.END, {'group_id': group_id})
+        # Названия групп передаются в выпадающий список одним вызовом,
+        # идентификаторы хранятся в параллельном списке
+        target_ids = [group_id for group_id, _ in target_groups]
+        target_combobox = ttk.Combobox(dialog, values=[name for _, name in target_groups], state='readonly')
+        target_combobox.pack(fill=tk.X, padx=10, pady=10)
         
         def on_select():
-            selection = target_listbox.curselection()
-            if not selection:
+            index = target_combobox.current()
+            if index < 0:
                 return
             
-            index = selection[0]
-            target_group_id = target_listbox.itemcget(index, 'group_id')
+            target_group_id = target_ids[index]
             
             # Объединяем группы
-            if self.item_mapping.merge_groups(self.current_group_id, target_group_id):
-                # Обновляем список групп
-                self._load_mappings()
+            diff = self._modify(self.item_mapping.merge_groups, self.current_group_id, target_group_id)
+            if diff:
+                # Обновляем только затронутые строки списка групп
+                self._apply_diff(diff)
             
             dialog.destroy()
         
@@ -300,10 +675,7 @@ class MappingEditor(ttk.Frame):
             return
         
         # Удаляем группу
-        if self.current_group_id in self.item_mapping.mappings:
-            del self.item_mapping.mappings[self.current_group_id]
-            self.item_mapping.save_mappings()
-            
+        if self._modify(self.item_mapping.delete_group, self.current_group_id):
             # Обновляем список групп
             self._load_mappings()
     
@@ -322,13 +694,15 @@ class MappingEditor(ttk.Frame):
             return
         
         # Добавляем элемент в группу
-        if self.item_mapping.add_item_to_group(self.current_group_id, name, code):
+        if self._modify(self.item_mapping.add_item_to_group, self.current_group_id, name, code):
             # Очищаем поля ввода
             self.new_item_name.delete(0, tk.END)
             self.new_item_code.delete(0, tk.END)
             
-            # Обновляем таблицу элементов
-            self._load_group_items(self.current_group_id)
+            # Добавляем в таблицу только новый элемент, сохраненный последним в группе
+            item = self._current_group['items'][-1]
+            self._append_item_row((item['name'], item['code']))
+            self._update_group_row(self.current_group_id)
     
     def _show_item_context_menu(self, event):
         """Отображение контекстного меню для элемента таблицы"""
@@ -340,12 +714,8 @@ class MappingEditor(ttk.Frame):
         # Выделяем элемент
         self.items_table.selection_set(item)
         
-        # Создаем контекстное меню
-        context_menu = tk.Menu(self, tearoff=0)
-        context_menu.add_command(label="Удалить", command=self._delete_selected_item)
-        
         # Отображаем меню
-        context_menu.post(event.x_root, event.y_root)
+        self._item_context_menu.post(event.x_root, event.y_root)
     
     def _close_progress_dialog(self, dialog, dialog_active_flag):
         """Закрытие диалога прогресса
@@ -378,9 +748,81 @@ class MappingEditor(ttk.Frame):
         code = values[1]
         
         # Удаляем элемент из группы
-        if self.item_mapping.remove_item_from_group(self.current_group_id, name, code):
-            # Обновляем таблицу элементов
-            self._load_group_items(self.current_group_id)
+        if self._modify(self.item_mapping.remove_item_from_group, self.current_group_id, name, code):
+            # Опустевшая группа удаляется из базы, поэтому перезагружаем список групп
+            if self.item_mapping.get_group(self.current_group_id) is None:
+                self._load_mappings()
+                return
+            
+            # Удаляем строку из таблицы и обновляем число элементов в списке групп
+            self._remove_item_row(item_id)
+            self._update_group_row(self.current_group_id)
+    
+    def _find_item_columns(self, data):
+        """Поиск столбцов с наименованиями и артикулами
+        
+        Результат кэшируется для текущего набора данных.
+        
+        Args:
+            data (pd.DataFrame): Обработанные данные
+            
+        Returns:
+            tuple: Имена столбцов наименования и артикула (None, если столбец не найден)
+        """
+        cache = self._columns_cache
+        if cache is not None and cache[0]() is data:
+            return cache[1:]
+        
+        # Столбцы просматриваются за один проход скомпилированным выражением;
+        # берется первый подходящий, просмотр прекращается, когда найдены оба
+        name_col = code_col = None
+        for col in data.columns:
+            hits = {hit.lower() for hit in _RE_ITEM_COLUMN.findall(str(col))}
+            if not hits or 'норм' in hits:
+                continue
+            if name_col is None and 'наименование' in hits:
+                name_col = col
+            if code_col is None and 'артикул' in hits:
+                code_col = col
+            if name_col is not None and code_col is not None:
+                break
+        
+        self._columns_cache = (weakref.ref(data, self._release_data_caches), name_col, code_col)
+        return name_col, code_col
+    
+    def _unique_item_pairs(self, data, name_col, code_col):
+        """Уникальные пары (наименование, артикул) для поиска похожих элементов
+        
+        Вызывается в фоновом потоке поиска. Результат кэшируется для текущего набора
+        данных, поэтому повторный автопоиск (например, с другим порогом) не просматривает
+        все строки заново.
+        
+        Args:
+            data (pd.DataFrame): Обработанные данные
+            name_col (str): Имя столбца с наименованиями
+            code_col (str): Имя столбца с артикулами
+            
+        Returns:
+            pd.DataFrame: Два столбца без повторяющихся строк
+        """
+        cache = self._pairs_cache
+        if cache is not None and cache[0]() is data and cache[1] == (name_col, code_col):
+            return cache[2]
+        
+        pairs = data[[name_col, code_col]].drop_duplicates()
+        self._pairs_cache = (weakref.ref(data, self._release_data_caches), (name_col, code_col), pairs)
+        return pairs
+    
+    def _release_data_caches(self, ref):
+        """Сброс кэшей, относящихся к освобожденному набору данных
+        
+        Args:
+            ref (weakref.ref): Слабая ссылка на освобожденные данные
+        """
+        for attr in ('_columns_cache', '_pairs_cache'):
+            cache = getattr(self, attr)
+            if cache is not None and cache[0] is ref:
+                setattr(self, attr, None)
     
     def _auto_find_mappings(self):
         """Автоматический поиск соответствий"""
@@ -400,10 +842,7 @@ class MappingEditor(ttk.Frame):
             return
         
         # Находим столбцы с наименованиями и артикулами
-        name_col = next((col for col in self.data_processor.processed_data.columns 
-                         if 'наименование' in col and 'норм' not in col), None)
-        code_col = next((col for col in self.data_processor.processed_data.columns 
-                         if 'артикул' in col and 'норм' not in col), None)
+        name_col, code_col = self._find_item_columns(self.data_processor.processed_data)
         
         if not name_col or not code_col:
             messagebox.showerror("Ошибка", "Не найдены столбцы с наименованиями и артикулами")
@@ -422,23 +861,33 @@ class MappingEditor(ttk.Frame):
         # Флаг для отслеживания состояния диалога
         dialog_active = True
         
-        # Функция обновления прогресса
+        # Последний прогресс, сообщенный потоком поиска: (значение, текст статуса).
+        # Поток только перезаписывает его, а UI-поток периодически забирает значение,
+        # поэтому очередь событий Tk не растет вместе с числом обратных вызовов
+        progress_slot = {"progress": None}
+        
+        # Функция обновления прогресса (вызывается из потока поиска)
         def update_progress(value, status_text):
-            # Проверяем, что диалог еще активен
-            if dialog_active:
-                # Используем after для обновления UI из другого потока
-                try:
-                    self.after(0, lambda: progress_dialog.update_progress(value, status_text))
-                except Exception:
-                    # Игнорируем ошибки, если диалог уже закрыт
-                    pass
+            progress_slot["progress"] = (value, status_text)
+        
+        # Периодический перенос прогресса в диалог в UI-потоке
+        def poll_progress():
+            if not dialog_active or not progress_dialog.winfo_exists():
+                return
+            progress = progress_slot["progress"]
+            if progress is not None:
+                progress_slot["progress"] = None
+                progress_dialog.update_progress(*progress)
+            self.after(PROGRESS_POLL_MS, poll_progress)
         
         # Функция для выполнения поиска в отдельном потоке
         def search_thread():
             try:
-                # Выполняем поиск похожих элементов через ItemMapping
+                # Выполняем поиск похожих элементов через ItemMapping; в поиск передаются
+                # только уникальные пары, подготовленные один раз для набора данных
+                pairs = self._unique_item_pairs(self.data_processor.processed_data, name_col, code_col)
                 result["similar_items"] = self.item_mapping.find_similar_items(
-                    self.data_processor.processed_data,
+                    pairs,
                     name_col,
                     code_col,
                     threshold,
@@ -454,6 +903,7 @@ class MappingEditor(ttk.Frame):
         thread = threading.Thread(target=search_thread)
         thread.daemon = True
         thread.start()
+        self.after(PROGRESS_POLL_MS, poll_progress)
         
         # Ждем завершения диалога
         self.wait_window(progress_dialog)
@@ -477,10 +927,11 @@ class MappingEditor(ttk.Frame):
             return
         
         # Добавляем найденные группы в базу соответствий
-        added = self.item_mapping.update_from_similar_items(similar_items)
+        diff = self._modify(self.item_mapping.update_from_similar_items, similar_items)
+        added = len(diff.get('added', [])) + len(diff.get('modified', []))
         
-        # Обновляем список групп
-        self._load_mappings()
+        # Обновляем только затронутые строки списка групп
+        self._apply_diff(diff)
         
         messagebox.showinfo("Информация", f"Добавлено {added} новых групп в базу соответствий")
 
@@ -520,22 +971,29 @@ class ProgressDialog(tk.Toplevel):
         self.status_label = ttk.Label(frame, text="")
         self.status_label.pack(pady=5)
         
-        # Центрируем диалог
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = parent.winfo_rootx() + (parent.winfo_width() - width) // 2
-        y = parent.winfo_rooty() + (parent.winfo_height() - height) // 2
-        self.geometry(f"{width}x{height}+{x}+{y}")
+        # Время последней перерисовки диалога
+        self._last_update = 0.0
+        
+        # Центрируем диалог, когда Tk рассчитает его размеры
+        self.after_idle(_center_on_parent, self, parent)
     
     def update_progress(self, value, status_text=""):
         """Обновление прогресса
         
+        Перерисовка выполняется не чаще PROGRESS_UPDATE_INTERVAL; промежуточные
+        значения только запоминаются индикатором.
+        
         Args:
             value: Значение прогресса (0-100)
             status_text: Текст статуса
         """
         self.progress["value"] = value
+        
+        now = time.monotonic()
+        if value < 100 and now - self._last_update < PROGRESS_UPDATE_INTERVAL:
+            return
+        self._last_update = now
+        
         if status_text:
             self.status_label["text"] = status_text
         self.update_idletasks()
@@ -568,10 +1026,5 @@ class MappingEditorDialog(tk.Toplevel):
         self.transient(parent)
         self.grab_set()
         
-        # Центрируем диалог относительно родительского окна
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = parent.winfo_rootx() + (parent.winfo_width() - width) // 2
-        y = parent.winfo_rooty() + (parent.winfo_height() - height) // 2
-        self.geometry(f"{width}x{height}+{x}+{y}")
+        # Центрируем диалог, когда Tk рассчитает его размеры
+        self.after_idle(_center_on_parent, self, parent)
@@ -0,0 +1,182 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from item_mapping import ItemMapping
+
+
+class FindSimilarItemsTest(unittest.TestCase):
+    """Тесты поиска похожих элементов"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mapping = ItemMapping(os.path.join(self.tmp_dir.name, 'item_mapping.json'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_same_name_and_code_column(self):
+        """Наименование и артикул в одном столбце"""
+        self.mapping.add_item_to_group('group_1', 'Болт М10', 'Болт М10')
+        column = 'наименование и артикул'
+        data = pd.DataFrame({column: ['Болт М10', 'Болт М-10', 'Болт М-10', 'Гайка М8']})
+
+        result = self.mapping.find_similar_items(data, column, column)
+
+        self.assertEqual(result, {'group_1': [('Болт М10', 'Болт М10'), ('Болт М-10', 'Болт М-10')]})
+
+    def test_item_in_several_groups_matches_last_group(self):
+        """Элемент из нескольких групп относится к последней группе"""
+        self.mapping.add_item_to_group('group_1', 'Болт М10', 'Б10')
+        self.mapping.add_item_to_group('group_1', 'Болт М10 оцинк.', 'Б10-Ц')
+        self.mapping.add_item_to_group('group_2', 'Болт М10', 'Б10')
+        data = pd.DataFrame({'Наименование': ['Болт М10', 'Болт М-10'], 'Артикул': ['Б10', 'Б10']})
+
+        result = self.mapping.find_similar_items(data, 'Наименование', 'Артикул')
+
+        self.assertEqual(result, {'group_2': [('Болт М10', 'Б10'), ('Болт М-10', 'Б10')]})
+        self.assertEqual(self.mapping.get_group_for_item('Болт М10', 'Б10'), 'group_1')
+
+    def test_nullable_integer_code_column(self):
+        """Артикулы в столбце с типом Int64 и пропусками"""
+        self.mapping.add_item_to_group('group_1', 'Болт М10', '1010')
+        data = pd.DataFrame({
+            'Наименование': ['Болт М10', 'Болт М-10', 'Гайка М8'],
+            'Артикул': pd.array([1010, 1010, None], dtype='Int64'),
+        })
+
+        result = self.mapping.find_similar_items(data, 'Наименование', 'Артикул')
+
+        self.assertEqual(result, {'group_1': [('Болт М10', '1010'), ('Болт М-10', '1010')]})
+
+
+class ItemMappingStorageTest(unittest.TestCase):
+    """Тесты записи и чтения базы соответствий"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mapping_file = os.path.join(self.tmp_dir.name, 'item_mapping.json')
+        self.mapping = ItemMapping(self.mapping_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _read_file(self):
+        with open(self.mapping_file, 'rb') as f:
+            return f.read()
+
+    def _fill_mapping(self, mapping):
+        mapping.add_item_to_group('group_1', 'Болт М10', 'Б10')
+        mapping.add_item_to_group('group_1', 'Болт М-10', 'Б10')
+        mapping.create_group('Пустая группа')
+
+    @unittest.skipUnless(pyarrow, 'требуется pyarrow')
+    def test_parquet_round_trip(self):
+        """Запись и чтение Parquet сохраняют группы, в том числе пустые"""
+        self._fill_mapping(self.mapping)
+        parquet_file = os.path.join(self.tmp_dir.name, 'item_mapping.parquet')
+
+        self.assertTrue(self.mapping.save_mappings_parquet(parquet_file))
+        loaded = ItemMapping(os.path.join(self.tmp_dir.name, 'other.json'))
+        self.assertTrue(loaded.load_mappings_parquet(parquet_file))
+
+        self.assertEqual(loaded.get_all_mappings(), self.mapping.get_all_mappings())
+        self.assertEqual(loaded.get_group_for_item('Болт М-10', 'Б10'), 'group_1')
+
+    @unittest.skipUnless(pyarrow, 'требуется pyarrow')
+    def test_parquet_mapping_file(self):
+        """Файл базы с расширением .parquet записывается и загружается как Parquet"""
+        parquet_file = os.path.join(self.tmp_dir.name, 'item_mapping.parquet')
+        mapping = ItemMapping(parquet_file)
+        self._fill_mapping(mapping)
+
+        loaded = ItemMapping(parquet_file)
+
+        with open(parquet_file, 'rb') as f:
+            self.assertEqual(f.read(4), b'PAR1')
+        self.assertEqual(loaded.get_all_mappings(), mapping.get_all_mappings())
+
+    def test_bulk_update_saves_once_on_exit(self):
+        """Изменения внутри bulk_update записываются при выходе из блока"""
+        before = self._read_file()
+
+        with self.mapping.bulk_update():
+            self._fill_mapping(self.mapping)
+            with self.mapping.bulk_update():
+                self.mapping.rename_group('group_1', 'Болты')
+            self.assertEqual(self._read_file(), before)
+
+        self.assertEqual(ItemMapping(self.mapping_file).get_all_mappings(), self.mapping.get_all_mappings())
+
+    def test_bulk_update_without_save(self):
+        """bulk_update(save=False) оставляет запись вызывающему коду"""
+        before = self._read_file()
+
+        with self.mapping.bulk_update(save=False):
+            self._fill_mapping(self.mapping)
+
+        self.assertEqual(self._read_file(), before)
+
+
+class ItemMappingGroupsTest(unittest.TestCase):
+    """Тесты изменения групп соответствий"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mapping_file = os.path.join(self.tmp_dir.name, 'item_mapping.json')
+        self.mapping = ItemMapping(self.mapping_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_next_group_id_after_deletions(self):
+        """Новые группы не получают идентификаторы оставшихся групп"""
+        first, second, third = (self.mapping.create_group(f'Группа {i}') for i in range(1, 4))
+        self.mapping.delete_group(first)
+        self.mapping.delete_group(third)
+
+        new_group = self.mapping.create_group('Новая группа')
+        reloaded = ItemMapping(self.mapping_file)
+        reloaded_group = reloaded.create_group('Группа после загрузки')
+
+        self.assertNotIn(new_group, (second, third))
+        self.assertEqual(len(self.mapping.get_all_mappings()), 2)
+        self.assertEqual(len(reloaded.get_all_mappings()), 3)
+        self.assertNotIn(reloaded_group, (second, new_group))
+
+    def test_merge_groups_diff(self):
+        """merge_groups возвращает удаленную и измененную группы"""
+        self.mapping.add_item_to_group('group_1', 'Болт М10', 'Б10')
+        self.mapping.add_item_to_group('group_2', 'Болт М-10', 'Б10')
+
+        diff = self.mapping.merge_groups('group_1', 'group_2')
+
+        self.assertEqual(diff, {'added': [], 'removed': ['group_1'], 'modified': ['group_2']})
+        self.assertEqual(len(self.mapping.get_group('group_2')['items']), 2)
+        self.assertEqual(self.mapping.merge_groups('group_1', 'group_2'), {})
+
+    def test_update_from_similar_items_diff(self):
+        """update_from_similar_items возвращает новые и замененные группы"""
+        bolts = [('Болт М10', 'Б10'), ('Болт М-10', 'Б10')]
+        nuts = [('Гайка М8', 'Г8'), ('Гайка М-8', 'Г8')]
+
+        self.assertEqual(self.mapping.update_from_similar_items({'group_1': bolts}),
+                         {'added': ['group_1'], 'removed': [], 'modified': []})
+        self.assertEqual(self.mapping.update_from_similar_items({'group_1': bolts}), {})
+        self.assertEqual(self.mapping.update_from_similar_items({'group_1': nuts, 'group_2': bolts[:1]}),
+                         {'added': [], 'removed': [], 'modified': ['group_1']})
+        self.assertEqual(self.mapping.get_group_for_item('Гайка М8', 'Г8'), 'group_1')
+
+
+if __name__ == '__main__':
+    unittest.main()